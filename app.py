@@ -1,14 +1,27 @@
 import streamlit as st
-import pandas as pd
 
-# Load dummy data
-@st.cache_data
+import asset_manifest
+import catalog_loader
+import metrics
+import pagination
+import recommendations
+import search_box
+
+# Load the price index over the grid columns of the listed items through the shared loader,
+# which rebuilds it only when the store changed
+@metrics.instrument()
 def load_data():
-    return pd.read_csv("luxury_items.csv")
+    return catalog_loader.load_price_index()
+
+# Function to open the results page for a search
+def open_search(query):
+    st.session_state.search_query = query
+    st.switch_page("pages/page2.py")
 
 def main():
     # Set page config to wide layout without a sidebar
     st.set_page_config(layout="wide")
+    metrics.start_page("home")
 
     # Custom CSS to hide the sidebar
     hide_streamlit_style = """
@@ -38,23 +51,19 @@ def main():
     # Header
     col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
     with col1:
-        st.image("logo.png", width=150)
+        asset_manifest.show_image(asset_manifest.full_image("logo.png", "Logo"), width=150)
     with col2:
-        search_query = st.text_input("Search", key="search_input", label_visibility="collapsed")
+        # Suggestions appear under the box once the user presses enter; picking one opens the results page
+        search_box.search_box("search_input", open_search)
     with col3:
         st.button("👤 Buyer")
 
-    # If user enters a search query and presses enter
-    if search_query:
-        st.session_state.search_query = search_query
-        st.switch_page("pages/page2.py")
-
-    # Category buttons
-    categories = ["Real Estate", "Stocks", "Paintings", "Gold", "Cars", "Watches", "Private Equity", "Jewellery"]
-    cols = st.columns(len(categories))
-    for i, category in enumerate(categories):
+    # Category buttons, generated from the categories that have listings, with live counts
+    categories = catalog_loader.category_facets()
+    cols = st.columns(max(len(categories), 1))
+    for i, (category, count) in enumerate(categories):
         with cols[i]:
-            if st.button(category):
+            if st.button(f"{category} ({count})", key=f"category_{category}"):
                 st.session_state.category = category
                 st.switch_page("pages/page2.py")
 
@@ -72,29 +81,27 @@ def main():
     #         {row['name']}  
     #         Price: ${row['price']:,.2f}
     #         """)
-    import os
-
-    # Function to check if the image path is valid (for local images)
-    def is_valid_image_path(image_path):
-        return os.path.exists(image_path)
+    # Rank listings from the precomputed similarity table, using what this session viewed recently
+    with metrics.timed("filter") as step:
+        ranked_ids = recommendations.home_feed(st.session_state.get('viewed_listing_ids', []))
+        step.rows = len(ranked_ids)
 
-    # Display some recommendations
-    cols = st.columns(3)
-    for i, row in data.iterrows():
-        with cols[i % 3]:
-            # Check if the image file exists locally
-            if pd.notna(row['image_url']) and row['image_url'] != '' and is_valid_image_path(row['image_url']):
-                image_url = row['image_url']  # Local image path
-            else:
-                # Use a placeholder if the image is missing
-                image_url = f"https://via.placeholder.com/200x150.png?text={row['name']}"
+    # Display some recommendations, one page at a time; only the rows of the current page are looked up
+    start, stop = pagination.paginate(len(data), key="recommendations")
+    page = data.frame.iloc[recommendations.feed_rows(data, ranked_ids, start, stop)]
+    with metrics.timed("render_tiles", rows=len(page)):
+        cols = st.columns(3)
+        for i, (_, row) in enumerate(page.iterrows()):
+            with cols[i % 3]:
+                # Resolve the image through the asset manifest: a cached thumbnail, or a placeholder if the image is missing
+                image_url = asset_manifest.grid_image(row['image_url'], row['name'])
 
-            st.image(image_url, use_column_width=True)
-            st.markdown(f"""
-            **{row['category']}**  
-            {row['name']}  
-            Price: ${row['price']:,.2f}
-            """)
+                asset_manifest.show_image(image_url, use_column_width=True, alt=row['name'])
+                st.markdown(f"""
+                **{row['category']}**  
+                {row['name']}  
+                Price: ${row['price']:,.2f}
+                """)
 
 
 
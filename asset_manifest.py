@@ -0,0 +1,183 @@
+import html
+import os
+import shutil
+import threading
+import time
+from urllib.parse import quote_plus
+
+import streamlit as st
+from PIL import Image
+
+import thumbnails
+
+# Directory holding the product images (override with ASSET_DIR)
+ASSET_DIR = os.environ.get("ASSET_DIR", ".")
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.gif'}
+
+# Directory Streamlit serves at /app/static when server.enableStaticServing is on: `static` next to app.py
+STATIC_DIR = os.environ.get("STATIC_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"))
+
+# URL of the static directory, relative to the app so it also works behind a base URL path
+STATIC_ROUTE = "app/static"
+
+# Minimum seconds between checks of the asset directory for changes
+REFRESH_INTERVAL = 2.0
+
+_manifest = None
+_lock = threading.Lock()
+
+
+# Function to describe one image: resolved path, pixel dimensions, content hash and the (mtime, size)
+# the hash was taken at; None if the file is not a readable image
+def build_record(path):
+    try:
+        stat = os.stat(path)
+        with Image.open(path) as image:  # Reads the header only
+            width, height = image.size
+    except (OSError, ValueError):
+        return None
+    return {
+        'path': path,
+        'width': width,
+        'height': height,
+        'sha1': thumbnails.content_hash(path),
+        'bytes': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'thumbnail': None,
+        'url': None,
+        'thumbnail_url': None,
+    }
+
+
+def _unchanged(record, stat):
+    return (stat.st_mtime_ns, stat.st_size) == (record['mtime'], record['bytes'])
+
+
+# Function to scan the asset directory into {lowercase file name: record}, reusing the records of `previous`
+# whose files have not changed
+def build_manifest(directory=ASSET_DIR, previous=None):
+    assets = {}
+    for entry in os.scandir(directory):
+        if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        record = (previous or {}).get(entry.name.lower())
+        if record is None or not _unchanged(record, entry.stat()):
+            record = build_record(os.path.relpath(entry.path) if directory == "." else entry.path)
+        if record is not None:
+            assets[entry.name.lower()] = record
+    return {
+        'static': static_serving(),
+        'directory': directory,
+        'directory_mtime': os.stat(directory).st_mtime_ns,
+        'checked_at': time.monotonic(),
+        'assets': assets,
+    }
+
+
+# Function to rebuild the records of files overwritten in place, which leaves the directory mtime alone
+def _refresh_records(assets):
+    for name, record in list(assets.items()):
+        try:
+            stat = os.stat(record['path'])
+        except OSError:
+            del assets[name]
+            continue
+        if not _unchanged(record, stat):
+            record = build_record(record['path'])
+            if record is None:
+                del assets[name]
+            else:
+                assets[name] = record
+
+
+# Function to get the current manifest. At most every REFRESH_INTERVAL it is rebuilt when files were added, removed
+# or renamed, and otherwise each file's (mtime, size) is checked, so lookups between checks never touch the disk.
+def get_manifest():
+    global _manifest
+    with _lock:
+        if _manifest is None:
+            _manifest = build_manifest()
+        elif time.monotonic() - _manifest['checked_at'] > REFRESH_INTERVAL:
+            if os.stat(_manifest['directory']).st_mtime_ns != _manifest['directory_mtime']:
+                _manifest = build_manifest(_manifest['directory'], previous=_manifest['assets'])
+            else:
+                _refresh_records(_manifest['assets'])
+                _manifest['checked_at'] = time.monotonic()
+        return _manifest
+
+
+# Function to check whether Streamlit serves the static directory (server.enableStaticServing in .streamlit/config.toml)
+def static_serving():
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+# Function to publish an image into the static directory under its content hash; returns its URL.
+# The "v" parameter makes the static handler answer with a far-future Cache-Control header next to its ETag,
+# so browsers and proxies keep the file until its content (and so its name) changes.
+def publish(path):
+    digest = thumbnails.content_hash(path)[:20]
+    name = digest + os.path.splitext(path)[1].lower()
+    target = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(target):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        # Copy to a temporary name first so the server never sends a half-written file
+        temporary = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(path, temporary)
+        os.replace(temporary, target)
+    return f"{STATIC_ROUTE}/{name}?v={digest}"
+
+
+# Function to resolve an item's image reference (case-insensitively) to its manifest record, or None
+def resolve(image_ref):
+    if not isinstance(image_ref, str) or not image_ref:
+        return None
+    return get_manifest()['assets'].get(os.path.basename(image_ref).lower())
+
+
+def _placeholder(name, size):
+    return f"https://via.placeholder.com/{size}.png?text={quote_plus(str(name))}"
+
+
+# Function to get the full-size image to show for an item, or a placeholder URL
+def full_image(image_ref, name, placeholder_size="400x300"):
+    record = resolve(image_ref)
+    if record is None:
+        # Remote references are shown as they are
+        if isinstance(image_ref, str) and image_ref.startswith(('http://', 'https://')):
+            return image_ref
+        return _placeholder(name, placeholder_size)
+    if not get_manifest()['static']:
+        return record['path']
+    if record['url'] is None:
+        record['url'] = publish(record['path'])
+    return record['url']
+
+
+# Function to get the grid thumbnail for an item, or a placeholder URL
+def grid_image(image_ref, name, placeholder_size="200x150"):
+    record = resolve(image_ref)
+    if record is None:
+        return full_image(image_ref, name, placeholder_size)
+    if record['thumbnail'] is None:
+        # Generated (or found in the derivative cache) once per manifest, not per tile
+        record['thumbnail'] = thumbnails.thumbnail_for(record['path'])
+    if not get_manifest()['static']:
+        return record['thumbnail']
+    if record['thumbnail_url'] is None:
+        record['thumbnail_url'] = publish(record['thumbnail'])
+    return record['thumbnail_url']
+
+
+# Function to show an image returned by full_image or grid_image. Static URLs are drawn with an <img> tag,
+# so the browser fetches and caches them itself; anything else goes through st.image.
+def show_image(url, width=None, use_column_width=False, caption=None, alt=None):
+    if not url.startswith(STATIC_ROUTE):
+        st.image(url, width=width, use_column_width=use_column_width, caption=caption)
+        return
+    size = 'width:100%' if use_column_width else f'width:{width}px' if width else 'max-width:100%'
+    alt = html.escape(alt or caption or '', quote=True)
+    st.markdown(f'<img src="{html.escape(url, quote=True)}" alt="{alt}" style="{size}" loading="lazy">',
+                unsafe_allow_html=True)
+    if caption:
+        st.caption(caption)
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Share of an attribute's values that must be numeric for it to be filtered by range instead of by value
+NUMERIC_SHARE = 0.8
+
+# Values offered per attribute in the filter picker, most common first
+MAX_VALUES = 200
+
+
+# Inverted index from (attribute, value) to row positions of the price index's frame, plus per-attribute
+# sorted numeric values for range filters. Filters are answered by intersecting sorted position arrays.
+class AttributeIndex:
+    def __init__(self, price_index, attributes):
+        # Map listing ids to frame rows through the price index, dropping rows of listings not in the frame
+        listing_ids = attributes['listing_id'].to_numpy(dtype=np.int64)
+        rows = np.full(len(listing_ids), -1, dtype=np.int64)
+        known = listing_ids < len(price_index.row_of)
+        rows[known] = price_index.row_of[listing_ids[known]]
+        attributes = attributes[rows >= 0]
+        rows = rows[rows >= 0]
+
+        self.postings = {}  # (attribute, value) -> sorted row positions
+        self.counts = {}  # attribute -> [(value, listings)], most common first
+        self.numbers = {}  # numeric attribute -> (sorted values, row positions in the same order)
+        for (attribute, value), members in attributes.groupby(['attribute', 'value'], sort=False).indices.items():
+            self.postings[(attribute, value)] = np.unique(rows[members])
+        for (attribute, value), members in self.postings.items():
+            self.counts.setdefault(attribute, []).append((value, len(members)))
+        for values in self.counts.values():
+            values.sort(key=lambda pair: (-pair[1], pair[0]))
+
+        numbers = attributes['number'].to_numpy(dtype=np.float64, na_value=np.nan)
+        for attribute, members in attributes.groupby('attribute', sort=False).indices.items():
+            values = numbers[members]
+            numeric = ~np.isnan(values)
+            if numeric.sum() < NUMERIC_SHARE * len(members):
+                continue
+            order = np.argsort(values[numeric], kind='stable')
+            self.numbers[attribute] = (values[numeric][order], rows[members][numeric][order])
+        self.listings = {attribute: sum(count for _, count in values) for attribute, values in self.counts.items()}
+
+    def __len__(self):
+        return len(self.postings)
+
+    # Attribute names, the ones carried by the most listings first
+    def attributes(self):
+        return sorted(self.listings, key=lambda attribute: (-self.listings[attribute], attribute))
+
+    def is_numeric(self, attribute):
+        return attribute in self.numbers
+
+    # The most common values of an attribute, as (value, listings) pairs
+    def values(self, attribute, limit=MAX_VALUES):
+        return self.counts.get(attribute, [])[:limit]
+
+    # Numeric span (lowest, highest) of an attribute, or None
+    def bounds(self, attribute):
+        entry = self.numbers.get(attribute)
+        if entry is None or not len(entry[0]):
+            return None
+        return float(entry[0][0]), float(entry[0][-1])
+
+    def equals(self, attribute, value):
+        return self.postings.get((attribute, value), np.empty(0, dtype=np.int64))
+
+    # Rows whose attribute lies within [low, high], by binary search over the sorted values; either bound may be None
+    def between(self, attribute, low=None, high=None):
+        entry = self.numbers.get(attribute)
+        if entry is None:
+            return np.empty(0, dtype=np.int64)
+        values, rows = entry
+        start = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+        stop = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+        return np.unique(rows[start:max(start, stop)])
+
+    # Sorted row positions matching every condition, or None when there are no conditions.
+    # Conditions are ('=', attribute, value) or ('range', attribute, low, high).
+    def query(self, conditions):
+        if not conditions:
+            return None
+        matches = []
+        for condition in conditions:
+            if condition[0] == '=':
+                matches.append(self.equals(condition[1], condition[2]))
+            else:
+                matches.append(self.between(condition[1], condition[2], condition[3]))
+        # Intersect starting from the rarest condition to keep the candidate set small
+        matches.sort(key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+
+# Function to describe a filter condition for display
+def describe(condition):
+    if condition[0] == '=':
+        return f"{condition[1]} = {condition[2]}"
+    _, attribute, low, high = condition
+    if low is not None and high is not None:
+        return f"{low:g} ≤ {attribute} ≤ {high:g}"
+    if low is not None:
+        return f"{attribute} ≥ {low:g}"
+    return f"{attribute} ≤ {high:g}"
@@ -0,0 +1,158 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Per-category name parts and detail templates used to build realistic rows
+CATEGORIES = {
+    'Cars': {
+        'names': ['Bugatti Chiron', 'Ferrari LaFerrari', 'Lamborghini Aventador', 'Rolls-Royce Phantom', 'McLaren P1'],
+        'image': 'car.png',
+        'details': lambda rng, n: [
+            f"Manufacturer: {maker}, Year: {year}, Top Speed: {speed} km/h, Power: {power} hp, Transmission: 7-speed dual-clutch"
+            for maker, year, speed, power in zip(
+                rng.choice(['Bugatti', 'Ferrari', 'Lamborghini', 'Rolls-Royce', 'McLaren'], n),
+                rng.integers(1990, 2025, n), rng.integers(250, 490, n), rng.integers(400, 1600, n)
+            )
+        ],
+        'price': (150_000, 5_000_000),
+    },
+    'Watches': {
+        'names': ['Rolex Daytona', 'Patek Philippe Nautilus', 'Audemars Piguet Royal Oak', 'Richard Mille RM 011', 'Omega Speedmaster'],
+        'image': 'watch.png',
+        'details': lambda rng, n: [
+            f"Manufacturer: {maker}, Year: {year}, Movement: Automatic self-winding, Diameter: {diameter} mm, Water Resistance: {depth} meters"
+            for maker, year, diameter, depth in zip(
+                rng.choice(['Rolex', 'Patek Philippe', 'Audemars Piguet', 'Richard Mille', 'Omega'], n),
+                rng.integers(1960, 2025, n), rng.integers(36, 46, n), rng.choice([50, 100, 300], n)
+            )
+        ],
+        'price': (5_000, 2_000_000),
+    },
+    'Real Estate': {
+        'names': ['Manhattan Penthouse', 'Beverly Hills Mansion', 'Burj Khalifa Penthouse', 'Monaco Villa', 'London Townhouse'],
+        'image': 'penthouse.png',
+        'details': lambda rng, n: [
+            f"Developer: {developer}, Year: {year}, Floor Area: {area:,} sq m, Bedrooms: {bedrooms}, Amenities: Private elevator, indoor pool, gym"
+            for developer, year, area, bedrooms in zip(
+                rng.choice(['Emaar Properties', 'Related Companies', 'Candy & Candy', 'Extell'], n),
+                rng.integers(1900, 2025, n), rng.integers(150, 3000, n), rng.integers(2, 12, n)
+            )
+        ],
+        'price': (2_000_000, 200_000_000),
+    },
+    'Art': {
+        'names': ["Salvator Mundi", 'Starry Night Study', 'Water Lilies', 'Untitled Composition', 'Portrait of a Lady'],
+        'image': 'salvator_mundi.png',
+        'details': lambda rng, n: [
+            f"Artist: {artist}, Year: {year}, Medium: Oil on canvas, Location: Private collection, Geneva"
+            for artist, year in zip(
+                rng.choice(['Leonardo da Vinci', 'Vincent van Gogh', 'Claude Monet', 'Pablo Picasso'], n),
+                rng.integers(1480, 1990, n)
+            )
+        ],
+        'price': (100_000, 450_000_000),
+    },
+    'Jewelry': {
+        'names': ['Graff Pink Diamond Ring', 'Tiffany Diamond Necklace', 'Cartier Panthere Bracelet', 'Bulgari Serpenti'],
+        'image': 'necklace.png',
+        'details': lambda rng, n: [
+            f"Manufacturer: {maker}, Year: {year}, Carat: {carat}, Metal: Platinum"
+            for maker, year, carat in zip(
+                rng.choice(['Graff', 'Tiffany', 'Cartier', 'Bulgari'], n), rng.integers(1950, 2025, n), rng.integers(1, 60, n)
+            )
+        ],
+        'price': (10_000, 50_000_000),
+    },
+    'Bags': {
+        'names': ['Hermes Birkin Bag', 'Chanel Classic Flap Bag', 'Louis Vuitton Capucines', 'Dior Lady Bag'],
+        'image': 'bag.png',
+        'details': lambda rng, n: [
+            f"Manufacturer: {maker}, Year: {year}, Material: {material}, Color: {color}"
+            for maker, year, material, color in zip(
+                rng.choice(['Hermes', 'Chanel', 'Louis Vuitton', 'Dior'], n), rng.integers(1980, 2025, n),
+                rng.choice(['Crocodile leather', 'Lambskin', 'Canvas'], n), rng.choice(['Black', 'Rouge', 'Gold', 'White'], n)
+            )
+        ],
+        'price': (3_000, 500_000),
+    },
+}
+
+DESCRIPTION_WORDS = (
+    "exquisite rare handcrafted limited edition heritage iconic bespoke timeless collectors masterpiece pristine "
+    "provenance certified exclusive unparalleled luxury craftsmanship legendary elegant condition original"
+).split()
+
+
+# Function to generate inventory, listings and messages frames with `rows` inventory items
+def generate(rows, listed_fraction=0.5, messages_per_listing=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    category_names = list(CATEGORIES)
+    categories = rng.choice(category_names, rows)
+    item_ids = np.arange(1, rows + 1)
+    names = np.empty(rows, dtype=object)
+    images = np.empty(rows, dtype=object)
+    details = np.empty(rows, dtype=object)
+    prices = np.empty(rows, dtype=float)
+    for category, spec in CATEGORIES.items():
+        mask = categories == category
+        count = int(mask.sum())
+        if not count:
+            continue
+        base = rng.choice(spec['names'], count)
+        names[mask] = [f"{name} #{number}" for name, number in zip(base, item_ids[mask])]
+        images[mask] = spec['image']
+        details[mask] = spec['details'](rng, count)
+        low, high = spec['price']
+        prices[mask] = np.round(np.exp(rng.uniform(np.log(low), np.log(high), count)), 2)
+
+    listed = rng.random(rows) < listed_fraction
+    all_items = pd.DataFrame({'item_id': item_ids, 'name': names, 'category': categories, 'image_url': images, 'listed': listed})
+
+    listed_idx = np.flatnonzero(listed)
+    descriptions = [' '.join(words) for words in rng.choice(DESCRIPTION_WORDS, (len(listed_idx), 25))]
+    luxury_items = pd.DataFrame({
+        'name': names[listed_idx],
+        'category': categories[listed_idx],
+        'price': prices[listed_idx],
+        'description': descriptions,
+        'image_url': images[listed_idx],
+        'details': details[listed_idx],
+        'item_id': item_ids[listed_idx],
+        'hide_fields': '',
+        'seller_details': 'Benchmark seller',
+    })
+
+    message_count = int(len(listed_idx) * messages_per_listing)
+    targets = rng.choice(listed_idx, message_count) if len(listed_idx) else np.array([], dtype=int)
+    messages = pd.DataFrame({
+        'Product Name': names[targets],
+        'Message': [f"I am interested in this item, please call me ({number})" for number in range(message_count)],
+    })
+    return all_items, luxury_items, messages
+
+
+# Function to write the synthetic CSVs (and the images they reference) into `directory`
+def write_dataset(directory, rows, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    all_items, luxury_items, messages = generate(rows, seed=seed)
+    all_items.to_csv(os.path.join(directory, 'all_items.csv'), index=False)
+    luxury_items.to_csv(os.path.join(directory, 'luxury_items.csv'), index=False)
+    messages.to_csv(os.path.join(directory, 'message.csv'), index=False)
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for image in {spec['image'] for spec in CATEGORIES.values()} | {'logo.png'}:
+        target = os.path.join(directory, image)
+        if not os.path.exists(target):
+            os.symlink(os.path.join(repo_root, image), target)
+    return {'all_items': len(all_items), 'luxury_items': len(luxury_items), 'messages': len(messages)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic marketplace catalog.")
+    parser.add_argument("directory")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write_dataset(args.directory, args.rows, seed=args.seed))
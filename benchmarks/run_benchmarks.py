@@ -0,0 +1,195 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Pages rendered headlessly, with the session state each one expects
+PAGES = [
+    ("home", "app.py", {}),
+    ("search", "pages/page2.py", {"search_query": "rolex"}),
+    ("category", "pages/page2.py", {"category": "Watches"}),
+    ("item_details", "pages/item_details.py", {}),
+    ("seller_dashboard", "seller_dashboard.py", {}),
+    ("messages", "pages/messages.py", {}),
+]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# Run one benchmark step and return its result record
+def measure(size, group, name, fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = fn()
+    seconds = (time.perf_counter() - start) / repeat
+    record = {
+        'size': size,
+        'group': group,
+        'step': name,
+        'seconds': round(seconds, 6),
+        'rows': rows if isinstance(rows, int) else None,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+    print(json.dumps(record), flush=True)
+    return record
+
+
+# Benchmark every stage for one dataset; runs inside a fresh process started in the dataset directory
+def run_worker(size):
+    sys.path.insert(0, REPO_ROOT)
+    import catalog_loader
+    import catalog_store
+    import recommendations
+    import search_index
+    import typeahead
+    from streamlit.testing.v1 import AppTest
+
+    measure(size, 'load', 'csv_migration', lambda: catalog_store.get_connection().close())
+    measure(size, 'load', 'listed_items_cold', lambda: len(catalog_loader.load_listed_items()))
+    measure(size, 'load', 'grid_columns_cold', lambda: len(catalog_loader.load_grid_items()))
+    measure(size, 'load', 'listed_items_cached', lambda: len(catalog_loader.load_listed_items()), repeat=20)
+    measure(size, 'load', 'all_items_cold', lambda: len(catalog_loader.load_all_items()))
+    measure(size, 'load', 'message_counts_cold', lambda: len(catalog_loader.message_counts()))
+
+    listings = catalog_loader.load_listed_items()
+    middle_item = int(listings['item_id'].iloc[len(listings) // 2])
+    middle_listing = int(listings['listing_id'].iloc[len(listings) // 2])
+    measure(size, 'lookup', 'get_item', lambda: int(catalog_store.get_item(middle_item) is not None), repeat=50)
+    measure(size, 'lookup', 'get_listing', lambda: int(catalog_store.get_listing(middle_listing) is not None), repeat=50)
+    measure(size, 'filter', 'search_index_build', lambda: len(search_index.get_index()))
+    measure(size, 'filter', 'search_query', lambda: len(search_index.search("rolex daytona")), repeat=20)
+    measure(size, 'filter', 'typeahead_build', lambda: len(typeahead.get_typeahead()))
+    measure(size, 'filter', 'typeahead_short_prefix', lambda: len(typeahead.suggest("ro")), repeat=50)
+    measure(size, 'filter', 'typeahead_long_prefix', lambda: len(typeahead.suggest("rolex da")), repeat=50)
+    measure(size, 'recommend', 'similarity_build', recommendations.build_table)
+    measure(size, 'recommend', 'similar_items', lambda: len(recommendations.similar_items(middle_listing)), repeat=50)
+    measure(size, 'filter', 'category_mask', lambda: int((listings['category'] == 'Watches').sum()), repeat=20)
+    measure(size, 'filter', 'category_facets', lambda: len(catalog_store.category_facets()), repeat=20)
+    measure(size, 'filter', 'price_index_build', lambda: len(catalog_loader.load_price_index()))
+    index = catalog_loader.load_price_index()
+    measure(size, 'filter', 'price_range_sorted', lambda: len(index.query(min_price=1e4, max_price=1e6, sort='price_asc')), repeat=20)
+    measure(size, 'filter', 'category_price_newest', lambda: len(index.query(category='Watches', min_price=1e4, sort='newest')), repeat=20)
+    measure(size, 'filter', 'attribute_index_build', lambda: len(catalog_loader.load_attribute_index()))
+    attributes = catalog_loader.load_attribute_index()
+    manufacturer = (attributes.values('Manufacturer') or [(None, 0)])[0][0]
+    conditions = [('=', 'Manufacturer', manufacturer), ('range', 'Year', 2020, None)]
+    measure(size, 'filter', 'attribute_filter_newest',
+            lambda: len(index.query(sort='newest', rows=attributes.query(conditions))), repeat=20)
+
+    for name, path, state in PAGES:
+        def render(path=path, state=state):
+            at = AppTest.from_file(os.path.join(REPO_ROOT, path), default_timeout=3600)
+            for key, value in state.items():
+                at.session_state[key] = value
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{path} raised: {at.exception[0].value}")
+            return len(at.markdown)
+        measure(size, 'render', name, render)
+
+
+# Generate the dataset for `size` and benchmark it in a child process; returns the parsed records
+def run_size(size, workdir):
+    sys.path.insert(0, BENCHMARK_DIR)
+    from generate_data import write_dataset
+
+    directory = os.path.join(workdir, f"catalog_{size}")
+    start = time.perf_counter()
+    counts = write_dataset(directory, size)
+    print(f"[{size}] generated {counts} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    env = dict(os.environ, MARKETPLACE_DB=os.path.join(directory, "marketplace.db"), THUMBNAIL_DIR=os.path.join(directory, ".thumbnails"))
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", str(size)],
+        cwd=directory, env=env, capture_output=True, text=True
+    )
+    records = [json.loads(line) for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0:
+        print(completed.stderr[-2000:], file=sys.stderr)
+        records.append({'size': size, 'group': 'error', 'step': 'worker', 'seconds': None, 'rows': None,
+                        'peak_rss_mb': None, 'error': completed.stderr.strip().splitlines()[-1:] or ['failed']})
+    return records
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# Function to print old/new timings side by side and return the steps that got slower than `threshold`
+def compare(old, new, threshold=1.2):
+    old_by_key = {(r['size'], r['group'], r['step']): r for r in old['results']}
+    regressions = []
+    print(f"{'size':>9}  {'step':<32} {'old (s)':>10} {'new (s)':>10} {'ratio':>7}")
+    for record in new['results']:
+        key = (record['size'], record['group'], record['step'])
+        before = old_by_key.get(key)
+        if not before or not before['seconds'] or record['seconds'] is None:
+            continue
+        ratio = record['seconds'] / before['seconds']
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{record['size']:>9}  {record['group'] + '/' + record['step']:<32} {before['seconds']:>10.4f} {record['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark catalog loading, filtering and page rendering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Inventory sizes to benchmark")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--workdir", help="Directory for generated datasets (default: a temporary directory)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        run_worker(args.worker)
+        return 0
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        records = []
+        for size in args.sizes:
+            records.extend(run_size(size, workdir))
+
+    results = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': records,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), results, args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import csv
+import logging
+import sys
+
+import catalog_snapshot
+import catalog_store
+import recommendations
+import search_index
+import typeahead
+
+logger = logging.getLogger(__name__)
+
+HIDEABLE_FIELDS = ["name", "category", "description", "price", "image_url", "details"]
+
+
+# Function to read bulk listing entries from a CSV with columns
+# item_id, price, description, hide_fields (separated by ';') and seller_details
+def read_entries(path):
+    entries = []
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            hide_fields = [field.strip() for field in (row.get('hide_fields') or '').split(';') if field.strip()]
+            unknown = set(hide_fields) - set(HIDEABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown hide_fields for item {row.get('item_id')}: {', '.join(sorted(unknown))}")
+            entries.append({
+                'item_id': row.get('item_id'),
+                'price': row.get('price') or 0.0,
+                'description': row.get('description') or '',
+                'hide_fields': hide_fields,
+                'seller_details': row.get('seller_details') or '',
+            })
+    return entries
+
+
+# Function to list entries in one batch, catch the search index up with the new listings, store their similar
+# listings and publish the new catalog snapshot, so no page run has to do any of it
+def bulk_list(entries):
+    results = catalog_store.list_items(entries)
+    listed = []
+    for result in results:
+        if result['status'] == 'listed':
+            result.pop('listing')
+            listed.append(result['listing_id'])
+    if listed:
+        _after_listing(listed)
+    return results
+
+
+# Catch the read-side structures up with committed listings. The listings are written by now, so a failure here
+# is logged rather than reported as a failed listing: readers publish a missing snapshot version themselves, the
+# search index and typeahead catch up on their next refresh and similar listings at the next full build.
+def _after_listing(listing_ids):
+    steps = [
+        ('search index', search_index.catch_up),
+        ('typeahead', typeahead.catch_up),
+        ('similar listings', lambda: recommendations.add_listings(listing_ids)),
+        ('catalog snapshot', catalog_snapshot.ensure_current),
+    ]
+    for name, step in steps:
+        try:
+            step()
+        except Exception:
+            logger.exception("Updating the %s after listing %d item(s) failed", name, len(listing_ids))
+
+
+# Function to write the per-item result report as CSV
+def write_report(results, file):
+    writer = csv.DictWriter(file, fieldnames=['item_id', 'status', 'listing_id', 'message'], extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List many inventory items in one batched write.")
+    parser.add_argument("input", nargs="?", help="CSV with item_id, price, description, hide_fields, seller_details")
+    parser.add_argument("--all-unlisted", action="store_true", help="List every item that is not listed yet")
+    parser.add_argument("--price", type=float, default=0.0, help="Price for --all-unlisted items")
+    parser.add_argument("--report", help="Write the per-item report to this CSV file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.all_unlisted:
+        items = catalog_store.load_all_items()
+        entries = [{'item_id': item_id, 'price': args.price} for item_id in items.loc[~items['listed'], 'item_id']]
+    elif args.input:
+        entries = read_entries(args.input)
+    else:
+        parser.error("provide an input CSV or --all-unlisted")
+
+    results = bulk_list(entries)
+    if args.report:
+        with open(args.report, 'w', newline='', encoding='utf-8') as file:
+            write_report(results, file)
+    else:
+        write_report(results, sys.stdout)
+
+    listed = sum(result['status'] == 'listed' for result in results)
+    print(f"Listed {listed} of {len(results)} items", file=sys.stderr)
+    return 0 if listed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
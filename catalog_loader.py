@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+import attribute_index
+import catalog_snapshot
+import catalog_store
+import metrics
+import price_index
+
+# Process-wide cache shared by every page and session: name -> (store version, value)
+_cache = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+# Single records shared by every session, most recently used last: (kind, id) -> (store version, record)
+RECORD_CACHE_SIZE = 4096
+_records = OrderedDict()
+
+
+# Return the cached value for `name`, reloading it only when the store's version counter for `table` moved
+def _cached(name, table, loader):
+    version = catalog_store.get_version(table)
+    with _lock:
+        entry = _cache.get(name)
+        if entry is not None and entry[0] == version:
+            _stats['hits'] += 1
+            metrics.record_cache(hit=True)
+            return entry[1]
+    value = loader()
+    metrics.record_cache(hit=False)
+    with _lock:
+        _stats['misses'] += 1
+        # Keep whichever copy is newer if another session reloaded concurrently
+        current = _cache.get(name)
+        if current is None or current[0] <= version:
+            _cache[name] = (version, value)
+    return value
+
+
+# Return the cached record `record_id` of `kind`, reloading it only when the store's version counter for `table` moved
+def _cached_record(kind, table, record_id, loader):
+    version = catalog_store.get_version(table)
+    key = (kind, record_id)
+    with _lock:
+        entry = _records.get(key)
+        if entry is not None and entry[0] == version:
+            _records.move_to_end(key)
+            _stats['hits'] += 1
+            metrics.record_cache(hit=True)
+            return entry[1]
+    record = loader(record_id)
+    metrics.record_cache(hit=False)
+    with _lock:
+        _stats['misses'] += 1
+        current = _records.get(key)
+        if current is None or current[0] <= version:
+            _records[key] = (version, record)
+            _records.move_to_end(key)
+        while len(_records) > RECORD_CACHE_SIZE:
+            _records.popitem(last=False)
+    return record
+
+
+# Function to look up one listing by id (None if it does not exist). Sessions keep only the id and resolve it here,
+# so every session shares one copy of the record. The record is shared: callers must copy before mutating it.
+def get_listing(listing_id):
+    return _cached_record('listing', 'listings', int(listing_id), catalog_store.get_listing)
+
+
+# Function to look up the most recent listing of an inventory item (None if it was never listed)
+def get_listing_for_item(item_id):
+    return _cached_record('item_listing', 'listings', int(item_id), catalog_store.get_listing_for_item)
+
+
+# Function to look up one inventory item by id (None if it does not exist). The record is shared: copy before mutating it.
+def get_item(item_id):
+    return _cached_record('item', 'items', int(item_id), catalog_store.get_item)
+
+
+# Function to load the buyer-facing listings from the columnar snapshot, optionally only some columns.
+# The frame is shared: callers must copy before mutating it.
+def load_listed_items(columns=None):
+    name = 'listings' if columns is None else 'listings:' + ','.join(columns)
+    return _cached(name, 'listings', lambda: catalog_snapshot.read_listings(columns))
+
+
+# Function to load only the narrow columns the tile grids render
+def load_grid_items():
+    return load_listed_items(catalog_snapshot.GRID_COLUMNS)
+
+
+# Function to get the price index over the grid columns (its `frame` is the shared grid frame)
+def load_price_index():
+    return _cached('price_index', 'listings', lambda: price_index.PriceIndex(load_grid_items()))
+
+
+# Function to get the attribute index over the parsed listing details, aligned with the price index rows
+def load_attribute_index():
+    return _cached(
+        'attribute_index', 'listings',
+        lambda: attribute_index.AttributeIndex(load_price_index(), catalog_store.load_listing_attributes())
+    )
+
+
+# Function to get (category, count) facets for the category buttons
+def category_facets():
+    return _cached('category_facets', 'listings', catalog_store.category_facets)
+
+
+# Function to load the seller's inventory. The frame is shared: callers must copy before mutating it.
+def load_all_items():
+    return _cached('items', 'items', catalog_store.load_all_items)
+
+
+# Function to get total/unread message counts per item
+def message_counts():
+    return _cached('message_counts', 'messages', catalog_store.message_counts)
+
+
+# Function to report cache hits and misses since the process started
+def cache_stats():
+    with _lock:
+        return dict(_stats)
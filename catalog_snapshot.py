@@ -0,0 +1,143 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import catalog_store
+
+# Directory holding the columnar snapshots of the listings (override with CATALOG_SNAPSHOT_DIR).
+# Every server process maps the same files read-only, so the catalog sits once in the page cache.
+SNAPSHOT_DIR = os.environ.get("CATALOG_SNAPSHOT_DIR", ".catalog")
+SNAPSHOT_PREFIX = "listings-"
+SNAPSHOT_SUFFIX = ".arrow"
+
+# Published versions kept on disk; older ones are removed once a newer version is published
+KEEP_VERSIONS = 2
+
+# Rows fetched from the database per batch while writing a snapshot
+BATCH_ROWS = 50_000
+
+# Pinned column types, so every reader gets the same dtypes regardless of the data
+LISTING_SCHEMA = pa.schema([
+    ('listing_id', pa.int64()),
+    ('item_id', pa.int64()),
+    ('name', pa.string()),
+    ('category', pa.dictionary(pa.int32(), pa.string())),
+    ('price', pa.float64()),
+    ('image_url', pa.dictionary(pa.int32(), pa.string())),
+    ('listed_at', pa.string()),
+    ('description', pa.string()),
+    ('details', pa.string()),
+    ('hide_fields', pa.string()),
+    ('seller_details', pa.string()),
+])
+
+# Narrow columns the tile grids render; the wide text columns are only read by the detail page
+GRID_COLUMNS = ['listing_id', 'item_id', 'name', 'category', 'price', 'image_url', 'listed_at']
+
+_write_lock = threading.Lock()
+
+
+# Snapshots are immutable: each listings version gets its own file, written once and never modified
+def snapshot_path(version):
+    return os.path.join(SNAPSHOT_DIR, f"{SNAPSHOT_PREFIX}{version}{SNAPSHOT_SUFFIX}")
+
+
+# Function to list the listings versions with a published snapshot, oldest first
+def published_versions():
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    versions = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+            version = name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)]
+            if version.isdigit():
+                versions.append(int(version))
+    return sorted(versions)
+
+
+def _remove_old_versions():
+    # Processes still mapping a removed file keep reading it until they swap; the space is freed when they unmap
+    for version in published_versions()[:-KEEP_VERSIONS]:
+        try:
+            os.remove(snapshot_path(version))
+        except OSError:
+            pass
+
+
+def _batches(conn):
+    # Read the listings in batches so the snapshot is never materialized twice in memory
+    columns = [field.name for field in LISTING_SCHEMA]
+    cursor = conn.execute("SELECT " + ", ".join(columns) + " FROM listings ORDER BY listing_id")
+    plain_schema = pa.schema([
+        pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+        for field in LISTING_SCHEMA
+    ])
+    while True:
+        rows = cursor.fetchmany(BATCH_ROWS)
+        if not rows:
+            break
+        arrays = [pa.array([row[index] for row in rows], type=plain_schema.field(index).type) for index in range(len(columns))]
+        yield pa.Table.from_arrays(arrays, schema=plain_schema)
+
+
+# Function to publish a snapshot of the current listings; returns the listings version it captured
+def write_snapshot():
+    with _write_lock:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with catalog_store.reader() as conn:
+            # A read transaction pins the version and the rows to the same point in time
+            conn.execute("BEGIN")
+            version = catalog_store.read_version(conn, 'listings')
+            if os.path.exists(snapshot_path(version)):
+                conn.execute("COMMIT")
+                return version
+            tables = list(_batches(conn))
+            conn.execute("COMMIT")
+        if tables:
+            table = pa.concat_tables(tables)
+        else:
+            table = LISTING_SCHEMA.empty_table()
+        table = table.cast(LISTING_SCHEMA).unify_dictionaries().combine_chunks()
+        table = table.replace_schema_metadata({'listings_version': str(version)})
+
+        # Uncompressed so readers can memory-map it; written aside and renamed so readers never see a partial file.
+        # Processes racing to publish the same version write identical contents, so the last rename wins harmlessly.
+        path = snapshot_path(version)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, temporary, compression='uncompressed')
+        os.replace(temporary, path)
+        _remove_old_versions()
+        return version
+
+
+# Function to make sure a snapshot of the current listings version is published; returns the version to read
+def ensure_current():
+    current = catalog_store.get_version('listings')
+    if os.path.exists(snapshot_path(current)):
+        return current
+    return write_snapshot()
+
+
+# Ids come back as nullable Int64, strings as Arrow-backed pandas strings that stay in the mapped file
+# instead of being copied into Python objects, and category/image_url as pandas categoricals
+_PANDAS_TYPES = {
+    pa.int64(): pd.Int64Dtype(),
+    pa.string(): pd.StringDtype("pyarrow"),
+}
+
+
+# Function to read listings from the published snapshot, loading only the requested columns
+def read_listings(columns=None):
+    for attempt in range(2):
+        version = ensure_current()
+        try:
+            table = feather.read_table(snapshot_path(version), columns=columns, memory_map=True)
+            break
+        except FileNotFoundError:
+            # Another process published a newer version and removed this one in between; look again
+            if attempt:
+                raise
+    return table.to_pandas(types_mapper=_PANDAS_TYPES.get)
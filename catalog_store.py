@@ -0,0 +1,794 @@
+import ast
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Location of the embedded catalog database (override with MARKETPLACE_DB)
+DB_PATH = os.environ.get("MARKETPLACE_DB", "marketplace.db")
+
+# Seller whose inbox read state the app tracks (override with MARKETPLACE_SELLER)
+SELLER_ID = os.environ.get("MARKETPLACE_SELLER", "default")
+
+# Legacy CSV files that are imported once into the database
+ALL_ITEMS_CSV = "all_items.csv"
+LUXURY_ITEMS_CSV = "luxury_items.csv"
+MESSAGES_CSV = "message.csv"
+
+ITEM_COLUMNS = ['item_id', 'name', 'category', 'image_url', 'listed']
+LISTING_COLUMNS = ['item_id', 'name', 'category', 'description', 'price', 'image_url', 'details', 'hide_fields', 'seller_details']
+MESSAGE_COLUMNS = ['message_id', 'item_id', 'product_name', 'message', 'created_at', 'thread_id']
+
+# Columns added after the first release, applied to databases created before them
+ADDED_COLUMNS = [
+    ('messages', 'is_read', 'INTEGER NOT NULL DEFAULT 0'),
+    ('listings', 'details_json', 'TEXT'),
+    ('messages', 'thread_id', 'INTEGER'),
+]
+
+# Indexes on added columns, created once the columns exist
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages(thread_id, message_id)",
+]
+
+# Split "Key: value, Key: value" only at commas that start a new "Key:" so values like
+# "Location: Museum of Modern Art, New York" stay in one piece
+DETAIL_SEPARATOR = re.compile(r",\s+(?=[^,:]{1,40}:\s)")
+
+# A detail value that is a number, optionally after a currency sign, with thousands separators and
+# followed by up to two unit words ("1500 hp", "1,000 sq m"); "7-speed dual-clutch" is not a number
+NUMBER_PATTERN = re.compile(r"\s*[$€£]?\s*(\d[\d,]*(?:\.\d+)?)(?:\s+[^\d\s]+){0,2}\s*")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    image_url TEXT,
+    listed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_items_category ON items(category);
+CREATE INDEX IF NOT EXISTS idx_items_name ON items(name);
+
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER,
+    name TEXT,
+    category TEXT,
+    description TEXT,
+    price REAL,
+    image_url TEXT,
+    details TEXT,
+    details_json TEXT,
+    hide_fields TEXT,
+    seller_details TEXT,
+    listed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_listings_item_id ON listings(item_id);
+CREATE INDEX IF NOT EXISTS idx_listings_category ON listings(category);
+
+CREATE TABLE IF NOT EXISTS messages (
+    message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER,
+    product_name TEXT NOT NULL,
+    message TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    is_read INTEGER NOT NULL DEFAULT 0,  -- Superseded by thread_reads; only read when threads are first built
+    thread_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_item_id ON messages(item_id);
+CREATE INDEX IF NOT EXISTS idx_messages_product_name ON messages(product_name);
+
+-- One thread per product, maintained at write time so the inbox never scans the message history
+CREATE TABLE IF NOT EXISTS message_threads (
+    thread_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_name TEXT NOT NULL UNIQUE,
+    item_id INTEGER,
+    total INTEGER NOT NULL DEFAULT 0,
+    last_message_id INTEGER NOT NULL DEFAULT 0,
+    last_message_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_message_threads_last ON message_threads(last_message_id);
+CREATE INDEX IF NOT EXISTS idx_message_threads_item_id ON message_threads(item_id);
+
+-- How many of a thread's messages each seller has read
+CREATE TABLE IF NOT EXISTS thread_reads (
+    seller TEXT NOT NULL,
+    thread_id INTEGER NOT NULL,
+    read_total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (seller, thread_id)
+);
+
+-- Typed attribute rows parsed from each listing's details; `number` is set for numeric values such as "1500 hp"
+CREATE TABLE IF NOT EXISTS listing_attributes (
+    listing_id INTEGER NOT NULL,
+    attribute TEXT NOT NULL,
+    value TEXT NOT NULL,
+    number REAL
+);
+CREATE INDEX IF NOT EXISTS idx_listing_attributes_value ON listing_attributes(attribute, value);
+CREATE INDEX IF NOT EXISTS idx_listing_attributes_number ON listing_attributes(attribute, number);
+CREATE INDEX IF NOT EXISTS idx_listing_attributes_listing ON listing_attributes(listing_id);
+
+-- Precomputed similar listings: each listing's nearest neighbours, best first (see recommendations.py)
+CREATE TABLE IF NOT EXISTS similar_listings (
+    listing_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    similar_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (listing_id, rank)
+);
+
+CREATE TABLE IF NOT EXISTS category_counts (
+    category TEXT PRIMARY KEY,
+    listings INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+# Database files whose schema and migration have been checked by this process
+_initialized = set()
+
+
+# Function to open a connection to the catalog database, creating and migrating it on first use
+def get_connection(db_path=None):
+    db_path = db_path or DB_PATH
+    key = os.path.abspath(db_path)
+    fresh = key not in _initialized or not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if fresh:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _add_missing_columns(conn)
+        if _get_meta(conn, 'migrated') is None:
+            migrate_from_csv(conn)
+        _backfill_details(conn)
+        if _get_meta(conn, 'category_counts') is None:
+            _rebuild_category_counts(conn)
+        if _get_meta(conn, 'message_threads') is None:
+            _rebuild_message_threads(conn)
+        if _get_meta(conn, 'listing_attributes') is None:
+            _rebuild_listing_attributes(conn)
+        _initialized.add(key)
+    return conn
+
+
+# Context manager that runs a block of statements as one write transaction
+@contextmanager
+def transaction(db_path=None):
+    conn = get_connection(db_path)
+    try:
+        # IMMEDIATE takes the write lock up front so concurrent sellers queue instead of clobbering each other
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+# Context manager for read-only access
+@contextmanager
+def reader(db_path=None):
+    conn = get_connection(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _add_missing_columns(conn):
+    for table, column, declaration in ADDED_COLUMNS:
+        existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+    for statement in ADDED_INDEXES:
+        conn.execute(statement)
+
+
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row['value'] if row else None
+
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+# Bump the change counter for a table group; callers use it to invalidate caches
+def _bump_version(conn, name):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, '1') "
+        "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+        (f"version:{name}",)
+    )
+
+
+# Function to read the change counter for "items", "listings" or "messages" on an open connection
+def read_version(conn, name):
+    return int(_get_meta(conn, f"version:{name}") or 0)
+
+
+# Function to read the change counter for "items", "listings" or "messages"
+def get_version(name, db_path=None):
+    with reader(db_path) as conn:
+        return read_version(conn, name)
+
+
+# Convert pandas missing values into SQL NULLs
+def _clean(value):
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _to_int(value):
+    value = _clean(value)
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    value = _clean(value)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(_clean(value))
+
+
+# Function to normalize a raw details value into an ordered list of [key, value] pairs.
+# Fragments without a "Key:" prefix are kept with a None key.
+def parse_details(details):
+    details = _clean(details)
+    if details is None or details == '':
+        return []
+    if isinstance(details, dict):
+        return [[str(key), str(value)] for key, value in details.items()]
+    details = str(details).strip()
+    if details.startswith('{'):
+        try:
+            parsed = ast.literal_eval(details)
+            if isinstance(parsed, dict):
+                return [[str(key), str(value)] for key, value in parsed.items()]
+        except (ValueError, SyntaxError):
+            pass
+    pairs = []
+    for part in DETAIL_SEPARATOR.split(details):
+        key, separator, value = part.partition(': ')
+        if separator and key.strip():
+            pairs.append([key.strip(), value.strip()])
+        elif part.strip():
+            pairs.append([None, part.strip()])
+    return pairs
+
+
+def _details_json(details):
+    return json.dumps(parse_details(details), ensure_ascii=False)
+
+
+# Function to read the number in a numeric detail value ("1500 hp" -> 1500.0, "1,000 sq m" -> 1000.0), or None
+def parse_number(value):
+    match = NUMBER_PATTERN.fullmatch(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    return float(match.group(1).replace(',', ''))
+
+
+# Attribute rows (listing_id, attribute, value, number) for a listing's parsed details
+def _attribute_rows(listing_id, details_json):
+    return [
+        (listing_id, key, value, parse_number(value))
+        for key, value in json.loads(details_json or '[]')
+        if key and value
+    ]
+
+
+# Parse details for rows stored before details_json existed
+def _backfill_details(conn):
+    rows = conn.execute("SELECT listing_id, details FROM listings WHERE details_json IS NULL").fetchall()
+    if rows:
+        with_lock = not conn.in_transaction
+        if with_lock:
+            conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "UPDATE listings SET details_json = ? WHERE listing_id = ? AND details_json IS NULL",
+            [(_details_json(row['details']), row['listing_id']) for row in rows]
+        )
+        if with_lock:
+            conn.execute("COMMIT")
+
+
+# Recompute the typed attribute rows from the parsed details of every listing
+def _rebuild_listing_attributes(conn):
+    with_lock = not conn.in_transaction
+    if with_lock:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM listing_attributes")
+    rows = conn.execute("SELECT listing_id, details_json FROM listings WHERE details_json != '[]'")
+    conn.executemany(
+        "INSERT INTO listing_attributes (listing_id, attribute, value, number) VALUES (?, ?, ?, ?)",
+        (attribute for row in rows.fetchall() for attribute in _attribute_rows(row['listing_id'], row['details_json']))
+    )
+    _set_meta(conn, 'listing_attributes', 1)
+    if with_lock:
+        conn.execute("COMMIT")
+
+
+# Recompute the per-category facet counts from the listings table
+def _rebuild_category_counts(conn):
+    with_lock = not conn.in_transaction
+    if with_lock:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM category_counts")
+    conn.execute(
+        "INSERT INTO category_counts (category, listings) "
+        "SELECT category, COUNT(*) FROM listings WHERE category IS NOT NULL AND category != '' GROUP BY category"
+    )
+    _set_meta(conn, 'category_counts', 1)
+    if with_lock:
+        conn.execute("COMMIT")
+
+
+# Group the stored messages into per-product threads; read flags from before threads existed
+# become the default seller's read state
+def _rebuild_message_threads(conn):
+    with_lock = not conn.in_transaction
+    if with_lock:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM thread_reads")
+    conn.execute("DELETE FROM message_threads")
+    conn.execute(
+        "INSERT INTO message_threads (product_name, item_id, total, last_message_id, last_message_at) "
+        "SELECT m.product_name, COALESCE(MAX(m.item_id), (SELECT MIN(i.item_id) FROM items i WHERE i.name = m.product_name)), "
+        "COUNT(*), MAX(m.message_id), MAX(m.created_at) FROM messages m GROUP BY m.product_name"
+    )
+    conn.execute(
+        "UPDATE messages SET thread_id = (SELECT t.thread_id FROM message_threads t WHERE t.product_name = messages.product_name)"
+    )
+    conn.execute(
+        "INSERT INTO thread_reads (seller, thread_id, read_total) "
+        "SELECT ?, thread_id, SUM(is_read) FROM messages GROUP BY thread_id HAVING SUM(is_read) > 0",
+        (SELLER_ID,)
+    )
+    _set_meta(conn, 'message_threads', 1)
+    if with_lock:
+        conn.execute("COMMIT")
+
+
+# One-shot import of the legacy CSV files into the database
+def migrate_from_csv(conn, base_dir="."):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have finished the migration while we waited for the lock
+        if _get_meta(conn, 'migrated') is not None:
+            conn.execute("COMMIT")
+            return
+
+        all_items_path = os.path.join(base_dir, ALL_ITEMS_CSV)
+        if os.path.exists(all_items_path):
+            all_items = pd.read_csv(all_items_path)
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (item_id, name, category, image_url, listed) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (_to_int(row['item_id']), _clean(row['name']), _clean(row['category']),
+                     _clean(row['image_url']), int(_to_bool(row['listed'])))
+                    for _, row in all_items.iterrows()
+                ]
+            )
+
+        luxury_items_path = os.path.join(base_dir, LUXURY_ITEMS_CSV)
+        if os.path.exists(luxury_items_path):
+            luxury_items = pd.read_csv(luxury_items_path)
+            for column in LISTING_COLUMNS:
+                if column not in luxury_items.columns:
+                    luxury_items[column] = None
+            conn.executemany(
+                "INSERT INTO listings (item_id, name, category, description, price, image_url, details, details_json, hide_fields, seller_details) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (_to_int(row['item_id']), _clean(row['name']), _clean(row['category']),
+                     _clean(row['description']), _to_float(row['price']), _clean(row['image_url']),
+                     _clean(row['details']), _details_json(row['details']),
+                     _clean(row['hide_fields']) or '', _clean(row['seller_details']))
+                    for _, row in luxury_items.iterrows()
+                ]
+            )
+
+        messages_path = os.path.join(base_dir, MESSAGES_CSV)
+        if os.path.exists(messages_path) and os.stat(messages_path).st_size > 0:
+            messages = pd.read_csv(messages_path)
+            names = {row['name']: row['item_id'] for row in conn.execute("SELECT item_id, name FROM items")}
+            conn.executemany(
+                "INSERT INTO messages (item_id, product_name, message) VALUES (?, ?, ?)",
+                [
+                    (names.get(row['Product Name']), _clean(row['Product Name']), _clean(row['Message']))
+                    for _, row in messages.iterrows()
+                ]
+            )
+
+        _rebuild_category_counts(conn)
+        _rebuild_message_threads(conn)
+        _rebuild_listing_attributes(conn)
+        for name in ('items', 'listings', 'messages'):
+            _bump_version(conn, name)
+        _set_meta(conn, 'migrated', 1)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# Function to load the seller's inventory (the former all_items.csv)
+def load_all_items(db_path=None):
+    with reader(db_path) as conn:
+        df = pd.read_sql_query("SELECT item_id, name, category, image_url, listed FROM items ORDER BY rowid", conn)
+    df['listed'] = df['listed'].astype(bool)
+    return df
+
+
+# Function to load the listings shown to buyers (the former luxury_items.csv)
+def load_listed_items(columns=None, db_path=None):
+    columns = columns or ['listing_id'] + LISTING_COLUMNS + ['listed_at']
+    query = "SELECT " + ", ".join(columns) + " FROM listings"
+    with reader(db_path) as conn:
+        df = pd.read_sql_query(query + " ORDER BY listing_id", conn)
+    # Same dtypes as the columnar snapshot (catalog_snapshot.LISTING_SCHEMA)
+    for column, dtype in (('listing_id', 'Int64'), ('item_id', 'Int64'), ('price', float), ('category', 'category'), ('image_url', 'category')):
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    for column in ('name', 'listed_at', 'description', 'details', 'hide_fields', 'seller_details'):
+        if column in df.columns:
+            df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+
+# Function to get (category, listing count) pairs, largest first
+def category_facets(db_path=None):
+    with reader(db_path) as conn:
+        rows = conn.execute(
+            "SELECT category, listings FROM category_counts WHERE listings > 0 ORDER BY listings DESC, category"
+        ).fetchall()
+    return [(row['category'], row['listings']) for row in rows]
+
+
+# Function to load the typed attribute rows (listing_id, attribute, value, number) of every listing, in no particular order
+def load_listing_attributes(db_path=None):
+    with reader(db_path) as conn:
+        # Plain tuples: building sqlite3.Row objects would take longer than the query itself
+        conn.row_factory = None
+        return pd.read_sql_query("SELECT listing_id, attribute, value, number FROM listing_attributes", conn)
+
+
+# Function to fetch a single listing by its id, with details already parsed into [key, value] pairs
+def get_listing(listing_id, db_path=None):
+    with reader(db_path) as conn:
+        row = conn.execute(
+            "SELECT listing_id, " + ", ".join(LISTING_COLUMNS) + ", details_json, listed_at FROM listings WHERE listing_id = ?",
+            (int(listing_id),)
+        ).fetchone()
+    if row is None:
+        return None
+    listing = dict(row)
+    listing['details'] = json.loads(listing.pop('details_json') or '[]')
+    return listing
+
+
+# Function to fetch the most recent listing of an inventory item (uses the item_id index)
+def get_listing_for_item(item_id, db_path=None):
+    with reader(db_path) as conn:
+        row = conn.execute(
+            "SELECT MAX(listing_id) AS listing_id FROM listings WHERE item_id = ?", (int(item_id),)
+        ).fetchone()
+    if row is None or row['listing_id'] is None:
+        return None
+    return get_listing(row['listing_id'], db_path=db_path)
+
+
+# Function to get the id of the first listing, used as the detail page default
+def first_listing_id(db_path=None):
+    with reader(db_path) as conn:
+        row = conn.execute("SELECT MIN(listing_id) AS listing_id FROM listings").fetchone()
+    return row['listing_id']
+
+
+# Function to get up to `limit` precomputed (similar_id, score) pairs per listing, best first: {listing_id: pairs}
+def similar_listings(listing_ids, limit=10, db_path=None):
+    listing_ids = [int(listing_id) for listing_id in listing_ids]
+    if not listing_ids:
+        return {}
+    with reader(db_path) as conn:
+        rows = conn.execute(
+            "SELECT listing_id, similar_id, score FROM similar_listings "
+            "WHERE listing_id IN (" + ", ".join("?" * len(listing_ids)) + ") AND rank < ? ORDER BY listing_id, rank",
+            listing_ids + [int(limit)]
+        ).fetchall()
+    neighbours = {}
+    for row in rows:
+        neighbours.setdefault(row['listing_id'], []).append((row['similar_id'], row['score']))
+    return neighbours
+
+
+# Function to store precomputed neighbours ({listing_id: [(similar_id, score), ...]}), replacing the listings' old rows
+def save_similar_listings(neighbours, db_path=None):
+    with transaction(db_path) as conn:
+        conn.executemany("DELETE FROM similar_listings WHERE listing_id = ?", [(listing_id,) for listing_id in neighbours])
+        conn.executemany(
+            "INSERT INTO similar_listings (listing_id, rank, similar_id, score) VALUES (?, ?, ?, ?)",
+            [
+                (listing_id, rank, similar_id, score)
+                for listing_id, pairs in neighbours.items()
+                for rank, (similar_id, score) in enumerate(pairs)
+            ]
+        )
+
+
+# Function to check whether the similar-listings table has been built in full for this database
+def similar_listings_built(db_path=None):
+    with reader(db_path) as conn:
+        return _get_meta(conn, 'similar_listings') is not None
+
+
+# Function to record that the similar-listings table was built in full
+def mark_similar_listings_built(db_path=None):
+    with transaction(db_path) as conn:
+        _set_meta(conn, 'similar_listings', 1)
+
+
+# Function to fetch a single inventory item by its id
+def get_item(item_id, db_path=None):
+    with reader(db_path) as conn:
+        row = conn.execute(
+            "SELECT item_id, name, category, image_url, listed FROM items WHERE item_id = ?", (int(item_id),)
+        ).fetchone()
+    if row is None:
+        return None
+    item = dict(row)
+    item['listed'] = bool(item['listed'])
+    return item
+
+
+def _build_listing(item_id, name, category, description, price, image_url, details, hide_fields, seller_details):
+    hide_fields = list(hide_fields or [])
+    return {
+        'item_id': int(item_id),
+        'name': name if 'name' not in hide_fields else '',
+        'category': category if 'category' not in hide_fields else '',
+        'description': description if 'description' not in hide_fields else '',
+        'price': _to_float(price) if 'price' not in hide_fields else None,
+        'image_url': image_url if 'image_url' not in hide_fields else '',
+        'details': _clean(details) if 'details' not in hide_fields else '',
+        'details_json': _details_json(details) if 'details' not in hide_fields else '[]',
+        'hide_fields': ','.join(hide_fields),  # Store hidden fields
+        'seller_details': seller_details,
+    }
+
+
+def _insert_listing(conn, listing):
+    cursor = conn.execute(
+        "INSERT INTO listings (item_id, name, category, description, price, image_url, details, details_json, hide_fields, seller_details) "
+        "VALUES (:item_id, :name, :category, :description, :price, :image_url, :details, :details_json, :hide_fields, :seller_details)",
+        listing
+    )
+    conn.execute("UPDATE items SET listed = 1 WHERE item_id = ?", (listing['item_id'],))
+    if listing['category']:
+        # Facet counts are maintained at write time so the category buttons never scan the listings
+        conn.execute(
+            "INSERT INTO category_counts (category, listings) VALUES (?, 1) "
+            "ON CONFLICT(category) DO UPDATE SET listings = listings + 1",
+            (listing['category'],)
+        )
+    listing['listing_id'] = cursor.lastrowid
+    conn.executemany(
+        "INSERT INTO listing_attributes (listing_id, attribute, value, number) VALUES (?, ?, ?, ?)",
+        _attribute_rows(listing['listing_id'], listing['details_json'])
+    )
+    return listing
+
+
+# Function to list an item: insert the listing and flip the listed flag in one transaction
+def list_item(item_id, name, category, description, price, image_url, details, hide_fields, seller_details, db_path=None):
+    listing = _build_listing(item_id, name, category, description, price, image_url, details, hide_fields, seller_details)
+    with transaction(db_path) as conn:
+        _insert_listing(conn, listing)
+        _bump_version(conn, 'listings')
+        _bump_version(conn, 'items')
+    return listing
+
+
+# Function to list many inventory items in a single transaction.
+# Each entry is a dict with item_id and optionally price, description, details, hide_fields and seller_details;
+# name, category and image_url come from the inventory. Items that are already listed are skipped unless the entry
+# sets relist, which adds a new listing like the single-item "List item" form does. Returns one result dict per
+# entry, in order, with status "listed", "already_listed", "not_found" or "error".
+def list_items(entries, db_path=None):
+    results = []
+    listed = 0
+    with transaction(db_path) as conn:
+        for entry in entries:
+            item_id = _to_int(entry.get('item_id'))
+            result = {'item_id': item_id, 'status': 'error', 'listing_id': None, 'message': ''}
+            results.append(result)
+            if item_id is None:
+                result['message'] = f"Invalid item id: {entry.get('item_id')!r}"
+                continue
+            item = conn.execute("SELECT name, category, image_url, listed FROM items WHERE item_id = ?", (item_id,)).fetchone()
+            if item is None:
+                result['status'] = 'not_found'
+                result['message'] = "Item not found in the catalog"
+                continue
+            if item['listed'] and not entry.get('relist'):
+                result['status'] = 'already_listed'
+                result['message'] = "Item is already listed"
+                continue
+            listing = _build_listing(
+                item_id, item['name'], item['category'], entry.get('description', ''), entry.get('price'),
+                item['image_url'], entry.get('details', ''), entry.get('hide_fields'), entry.get('seller_details')
+            )
+            # A savepoint per entry keeps one bad row from rolling back the rest of the batch
+            conn.execute("SAVEPOINT bulk_item")
+            try:
+                _insert_listing(conn, listing)
+                conn.execute("RELEASE bulk_item")
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO bulk_item")
+                conn.execute("RELEASE bulk_item")
+                result['message'] = str(e)
+                continue
+            result.update(status='listed', listing_id=listing['listing_id'], listing=listing)
+            listed += 1
+        if listed:
+            _bump_version(conn, 'listings')
+            _bump_version(conn, 'items')
+    return results
+
+
+def _thread_for(conn, product_name, item_id):
+    conn.execute(
+        "INSERT INTO message_threads (product_name, item_id) VALUES (?, ?) ON CONFLICT(product_name) DO NOTHING",
+        (product_name, item_id)
+    )
+    return conn.execute("SELECT thread_id FROM message_threads WHERE product_name = ?", (product_name,)).fetchone()['thread_id']
+
+
+# Function to store a batch of (product_name, message, item_id) records in one transaction; returns their message ids
+def add_messages(records, db_path=None):
+    message_ids = []
+    with transaction(db_path) as conn:
+        for product_name, message, item_id in records:
+            if item_id is None:
+                row = conn.execute("SELECT item_id FROM items WHERE name = ?", (product_name,)).fetchone()
+                item_id = row['item_id'] if row else None
+            thread_id = _thread_for(conn, product_name, _to_int(item_id))
+            cursor = conn.execute(
+                "INSERT INTO messages (item_id, product_name, message, thread_id) VALUES (?, ?, ?, ?)",
+                (_to_int(item_id), product_name, message, thread_id)
+            )
+            conn.execute(
+                "UPDATE message_threads SET total = total + 1, last_message_id = ?, last_message_at = CURRENT_TIMESTAMP, "
+                "item_id = COALESCE(item_id, ?) WHERE thread_id = ?",
+                (cursor.lastrowid, _to_int(item_id), thread_id)
+            )
+            message_ids.append(cursor.lastrowid)
+        if message_ids:
+            _bump_version(conn, 'messages')
+    return message_ids
+
+
+# Function to count a seller's total and unread messages per item from the thread table
+def message_counts(seller=SELLER_ID, db_path=None):
+    with reader(db_path) as conn:
+        rows = conn.execute(
+            "SELECT t.item_id, SUM(t.total) AS total, SUM(t.total - COALESCE(r.read_total, 0)) AS unread "
+            "FROM message_threads t LEFT JOIN thread_reads r ON r.seller = ? AND r.thread_id = t.thread_id "
+            "WHERE t.item_id IS NOT NULL GROUP BY t.item_id",
+            (seller,)
+        ).fetchall()
+    return {row['item_id']: {'total': row['total'], 'unread': row['unread']} for row in rows}
+
+
+# Function to get a page of a seller's inbox threads, newest activity first.
+# `before` is the cursor from the previous page (the last thread's last_message_id).
+def inbox_threads(seller=SELLER_ID, before=None, limit=20, db_path=None):
+    query = (
+        "SELECT t.thread_id, t.item_id, t.product_name, t.total, t.total - COALESCE(r.read_total, 0) AS unread, "
+        "t.last_message_id, t.last_message_at "
+        "FROM message_threads t LEFT JOIN thread_reads r ON r.seller = ? AND r.thread_id = t.thread_id"
+    )
+    params = [seller]
+    if before is not None:
+        query += " WHERE t.last_message_id < ?"
+        params.append(int(before))
+    query += " ORDER BY t.last_message_id DESC LIMIT ?"
+    params.append(int(limit))
+    with reader(db_path) as conn:
+        return [dict(row) for row in conn.execute(query, params)]
+
+
+# Function to get a page of one thread's messages, newest first; `before` is the last message id already shown
+def thread_messages(thread_id, before=None, limit=10, db_path=None):
+    query = "SELECT " + ", ".join(MESSAGE_COLUMNS) + " FROM messages WHERE thread_id = ?"
+    params = [int(thread_id)]
+    if before is not None:
+        query += " AND message_id < ?"
+        params.append(int(before))
+    query += " ORDER BY message_id DESC LIMIT ?"
+    params.append(int(limit))
+    with reader(db_path) as conn:
+        return [dict(row) for row in conn.execute(query, params)]
+
+
+# Function to get a seller's inbox totals: threads, messages and unread messages
+def inbox_summary(seller=SELLER_ID, db_path=None):
+    with reader(db_path) as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) AS threads, COALESCE(SUM(t.total), 0) AS messages, "
+            "COALESCE(SUM(t.total - COALESCE(r.read_total, 0)), 0) AS unread "
+            "FROM message_threads t LEFT JOIN thread_reads r ON r.seller = ? AND r.thread_id = t.thread_id",
+            (seller,)
+        ).fetchone()
+    return dict(row)
+
+
+# Function to mark a seller's messages as read: one thread, the threads about one item, or everything
+def mark_messages_read(item_id=None, thread_id=None, seller=SELLER_ID, db_path=None):
+    query = (
+        "INSERT INTO thread_reads (seller, thread_id, read_total) SELECT ?, thread_id, total FROM message_threads"
+    )
+    params = [seller]
+    if thread_id is not None:
+        query += " WHERE thread_id = ?"
+        params.append(int(thread_id))
+    elif item_id is not None:
+        query += " WHERE item_id = ?"
+        params.append(int(item_id))
+    else:
+        query += " WHERE true"  # Needed so SQLite parses the ON CONFLICT clause after a SELECT
+    query += (
+        " ON CONFLICT(seller, thread_id) DO UPDATE SET read_total = excluded.read_total"
+        " WHERE thread_reads.read_total != excluded.read_total"
+    )
+    with transaction(db_path) as conn:
+        cursor = conn.execute(query, params)
+        if cursor.rowcount:
+            _bump_version(conn, 'messages')
+        return cursor.rowcount
+
+
+if __name__ == "__main__":
+    # Running this module directly performs (or confirms) the one-shot CSV migration
+    with reader() as conn:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ('items', 'listings', 'messages')}
+    print(f"Catalog database ready at {DB_PATH}: {counts}")
@@ -0,0 +1,30 @@
+import threading
+
+import write_queue
+
+# Append-only buyer message log. Appends go through the background write queue, which
+# group-commits the messages arriving within one window in a single transaction; cross-process
+# safety comes from the database write lock, so several server processes can append to the same log.
+class MessageLog:
+    def __init__(self, queue=None):
+        self.queue = queue
+
+    # Add a record to the log; with wait=True, return its offset once its batch is committed,
+    # otherwise return the write ticket straight away
+    def append(self, product_name, message, item_id=None, wait=True):
+        queue = self.queue or write_queue.get_queue()
+        ticket = queue.submit('message', (product_name, message, item_id))
+        return ticket.wait() if wait else ticket
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+# Function to get the process-wide message log
+def get_log():
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = MessageLog()
+    return _log
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Prometheus text file the process-wide metrics are exported to (set METRICS_FILE to enable)
+METRICS_FILE = os.environ.get("METRICS_FILE")
+
+# Minimum seconds between exports of the metrics file
+EXPORT_INTERVAL = 10.0
+
+# Process-wide totals shared by every session: (page, step) -> stats
+_totals = {}
+_lock = threading.Lock()
+_last_export = 0.0
+
+# Page and active steps of the script run on this thread
+_local = threading.local()
+
+
+def _new_stats():
+    return {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'cache_hits': 0, 'cache_misses': 0}
+
+
+def _add(stats, record):
+    stats['calls'] += 1
+    stats['seconds'] += record.seconds
+    stats['max_seconds'] = max(stats['max_seconds'], record.seconds)
+    stats['rows'] += record.rows or 0
+    stats['cache_hits'] += record.cache_hits
+    stats['cache_misses'] += record.cache_misses
+
+
+def _in_script():
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+# One timed execution of a step
+class Step:
+    def __init__(self, page, step, rows=None):
+        self.page = page
+        self.step = step
+        self.rows = rows
+        self.seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+# Function to mark the start of a page run; steps timed on this thread are attributed to `page`
+def start_page(page):
+    _local.page = page
+    _local.stack = []
+    if _in_script():
+        st.session_state['metrics_last_run'] = {'page': page, 'steps': []}
+
+
+def current_page():
+    return getattr(_local, 'page', 'unknown')
+
+
+# Time the enclosed block as `step`; set `.rows` on the yielded record to report how many rows it handled
+@contextmanager
+def timed(step, rows=None):
+    record = Step(current_page(), step, rows)
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - started
+        stack.pop()
+        _record(record)
+
+
+def _row_count(result):
+    if isinstance(result, (list, tuple, dict)) or hasattr(result, 'iloc'):
+        return len(result)
+    return None
+
+
+# Decorator timing every call of a function as `step` (the function name by default),
+# counting the rows of the list, dict or DataFrame it returns unless count_rows is False
+def instrument(step=None, count_rows=True):
+    def decorate(function):
+        name = step or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(name) as record:
+                result = function(*args, **kwargs)
+                if count_rows:
+                    record.rows = _row_count(result)
+            return result
+        return wrapper
+    return decorate
+
+
+# Function to attribute a cache lookup to the innermost step running on this thread
+def record_cache(hit):
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        return
+    if hit:
+        stack[-1].cache_hits += 1
+    else:
+        stack[-1].cache_misses += 1
+
+
+def _record(record):
+    key = (record.page, record.step)
+    with _lock:
+        _add(_totals.setdefault(key, _new_stats()), record)
+    if _in_script():
+        _add(st.session_state.setdefault('metrics', {}).setdefault(key, _new_stats()), record)
+        last_run = st.session_state.get('metrics_last_run')
+        if last_run is not None:
+            last_run['steps'].append({'step': record.step, 'seconds': record.seconds, 'rows': record.rows})
+    if METRICS_FILE:
+        _maybe_export()
+
+
+# Function to get the process-wide totals as a list of rows
+def snapshot():
+    with _lock:
+        return [dict(stats, page=page, step=step) for (page, step), stats in sorted(_totals.items())]
+
+
+# Function to get this session's totals as a list of rows
+def session_snapshot():
+    stats = st.session_state.get('metrics', {})
+    return [dict(values, page=page, step=step) for (page, step), values in sorted(stats.items())]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Function to render the process-wide totals in the Prometheus text exposition format
+def prometheus_text():
+    rows = snapshot()
+    series = [
+        ('marketplace_step_seconds', 'summary', 'Time spent in an instrumented step', [('_sum', 'seconds'), ('_count', 'calls')]),
+        ('marketplace_step_seconds_max', 'gauge', 'Slowest single execution of a step', [('', 'max_seconds')]),
+        ('marketplace_step_rows_total', 'counter', 'Rows handled by a step', [('', 'rows')]),
+        ('marketplace_cache_hits_total', 'counter', 'Catalog cache hits inside a step', [('', 'cache_hits')]),
+        ('marketplace_cache_misses_total', 'counter', 'Catalog cache misses inside a step', [('', 'cache_misses')]),
+    ]
+    lines = []
+    for name, kind, help_text, fields in series:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for row in rows:
+            labels = f'page="{_escape(row["page"])}",step="{_escape(row["step"])}"'
+            for suffix, field in fields:
+                lines.append(f"{name}{suffix}{{{labels}}} {row[field]}")
+    return "\n".join(lines) + "\n"
+
+
+# Function to write the Prometheus text file (written aside and renamed so scrapers never see a partial file)
+def export(path=None):
+    path = path or METRICS_FILE
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as handle:
+        handle.write(prometheus_text())
+    os.replace(temporary, path)
+
+
+def _maybe_export():
+    global _last_export
+    now = time.monotonic()
+    with _lock:
+        if now - _last_export < EXPORT_INTERVAL:
+            return
+        _last_export = now
+    export()
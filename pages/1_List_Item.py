@@ -1,63 +1,41 @@
 import streamlit as st
-import pandas as pd
-import os
+
+import asset_manifest
+import catalog_loader
+import metrics
+import write_queue
+import write_status
 
 st.set_page_config(layout="wide", page_title="List Item")
+metrics.start_page("list_item")
 
-# Function to load the selected item from all_items.csv
+# Function to load the selected item through the shared catalog lookup by primary key
+@metrics.instrument()
 def load_item(item_id):
-    if os.path.exists('all_items.csv'):
-        all_items = pd.read_csv('all_items.csv')
-        item = all_items[all_items['item_id'] == int(item_id)]
-        if not item.empty:
-            st.write(f"Loaded item from all_items.csv: {item}")
-            return item.iloc[0]
-        else:
-            st.error("Item not found in all_items.csv")
-            return None
-    else:
-        st.error("all_items.csv not found")
-        return None
-
-# Function to move the item from all_items.csv to luxury_items.csv
-def list_item(item_id, name, category, description, price, image_url, details, hide_fields, seller_details):
     try:
-        # Prepare new item details to be saved in luxury_items.csv
-        new_item = pd.DataFrame([{
+        item = catalog_loader.get_item(item_id)
+    except (TypeError, ValueError):
+        item = None
+    if item is None:
+        st.error("Item not found in the catalog")
+    return item
+
+# Function to queue the listing on the background write queue; the insert and the listed flag update commit atomically
+def list_item(item_id, description, price, details, hide_fields, seller_details):
+    try:
+        ticket = write_queue.submit('list_item', {
             'item_id': item_id,
-            'name': name if 'name' not in hide_fields else '',
-            'category': category if 'category' not in hide_fields else '',
-            'description': description if 'description' not in hide_fields else '',
-            'price': price if 'price' not in hide_fields else '',
-            'image_url': image_url if 'image_url' not in hide_fields else '',
-            'details': details if 'details' not in hide_fields else '',
-            'hide_fields': ','.join(hide_fields),  # Store hidden fields
-            'seller_details': seller_details
-        }])
-
-        # Check if luxury_items.csv exists
-        if os.path.exists('luxury_items.csv'):
-            luxury_items = pd.read_csv('luxury_items.csv')
-        else:
-            luxury_items = pd.DataFrame(columns=['item_id', 'name', 'category', 'description', 'price', 'image_url', 'details', 'hide_fields', 'seller_details'])
-
-        # Append new item to luxury_items dataframe
-        luxury_items = pd.concat([luxury_items, new_item], ignore_index=True)
-
-        # Save the updated luxury_items.csv
-        luxury_items.to_csv('luxury_items.csv', index=False)
-        # Update the listed flag in all_items.csv
-        if os.path.exists('all_items.csv'):
-            all_items = pd.read_csv('all_items.csv')
-            # Update the listed flag for the specific item
-            all_items.loc[all_items['item_id'] == int(item_id), 'listed'] = True
-            # Save the updated all_items.csv
-            all_items.to_csv('all_items.csv', index=False)
-        st.success(f"Item '{name}' successfully listed!")
-
+            'description': description,
+            'price': price,
+            'details': details,
+            'hide_fields': hide_fields,
+            'seller_details': seller_details,
+            # The form lists the item again even if it is already listed, adding a new listing
+            'relist': True,
+        })
+        write_status.track('listing_ticket', ticket)
     except Exception as e:
         st.error(f"Error listing item: {e}")
-        st.write(f"Current working directory: {os.getcwd()}")
 
 # Custom CSS styling to enforce light theme and apply color palette
 st.markdown("""
@@ -131,8 +109,8 @@ header, footer, .reportview-container .main {
 """, unsafe_allow_html=True)
 
 
-# Get item_id from session state
-item_id = st.session_state.get('selected_item_id')
+# Get item_id from the URL (?item_id=) or session state
+item_id = st.query_params.get('item_id', st.session_state.get('selected_item_id'))
 if item_id is None:
     st.error("No item selected. Please go back and select an item.")
     st.stop()
@@ -145,7 +123,7 @@ if item is None:
 
 # Display the item details
 st.markdown(f"### Listing Item: {item['name']}")
-st.image(item['image_url'], use_column_width=True)
+asset_manifest.show_image(asset_manifest.full_image(item['image_url'], item['name']), use_column_width=True)
 st.markdown(f"**Category:** {item['category']}")
 
 # Form for the seller to add additional details
@@ -160,13 +138,18 @@ with st.form(key="list_item_form"):
     if submit_button:
         list_item(
             item_id=item_id,
-            name=item['name'],
-            category=item['category'],
             description=description,
             price=price,
-            image_url=item['image_url'],
             details=item['details'] if 'details' in item else '',
             hide_fields=hide_fields,
             seller_details=seller_details
         )
-        st.balloons()
+
+# Report the queued listing once the write queue has applied it
+if write_status.show_status(
+    'listing_ticket',
+    queued_text=f"Listing '{item['name']}'...",
+    done_text=f"Item '{item['name']}' successfully listed!",
+    failed_text="Error listing item"
+) == 'done':
+    st.balloons()
@@ -1,27 +1,36 @@
 import streamlit as st
-import pandas as pd
-import ast
-import os
-import csv
 
-# Function to parse the 'details' field, either as a dictionary or a string
-def parse_details(details_str):
+import asset_manifest
+import catalog_loader
+import catalog_store
+import message_log
+import metrics
+import recommendations
+import write_status
+
+# Number of similar items shown under the item
+SIMILAR_ITEMS = 3
+
+# Function to load one listing with its details parsed at ingest, handling missing fields
+@metrics.instrument()
+def load_item(listing_id):
     try:
-        return ast.literal_eval(details_str)
-    except:
-        return details_str
+        item = catalog_loader.get_listing(listing_id)
+    except (TypeError, ValueError):
+        return None
+    if item is None:
+        return None
+    # The looked-up record is shared by every session
+    item = dict(item)
 
-# Function to load the CSV data, handling missing fields
-def load_data():
-    df = pd.read_csv("luxury_items.csv")
-    
     # Fill missing values with sensible defaults
-    df['details'] = df['details'].apply(parse_details).fillna('')
-    df['price'] = df['price'].fillna(0.0)
-    df['category'] = df['category'].fillna('Unknown Category')
-    df['image_url'] = df['image_url'].fillna('https://via.placeholder.com/400x300?text=No+Image')
-    
-    return df
+    item['price'] = item['price'] if item['price'] is not None else 0.0
+    item['category'] = item['category'] or 'Unknown Category'
+    # Full-size image resolved through the asset manifest (case-insensitive, placeholder if missing)
+    item['image_url'] = asset_manifest.full_image(item['image_url'], 'No Image')
+    item['description'] = item['description'] or ''
+
+    return item
 
 # Function to display a popup message
 def show_popup():
@@ -64,24 +73,70 @@ def show_popup():
         unsafe_allow_html=True
     )
 
-# Function to save the message to a CSV
-def save_message_to_csv(product_name, message):
-    filename = "message.csv"
-    
+# Function to queue the message for the message log; the page polls the ticket until its batch is committed
+def save_message(product_name, message, item_id=None):
     try:
-        with open(filename, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            if os.stat(filename).st_size == 0:  # Write header if file is empty
-                writer.writerow(['Product Name', 'Message'])
-            writer.writerow([product_name, message])
-        st.success(f"Message saved successfully to {filename}")
+        ticket = message_log.get_log().append(product_name, message, item_id=item_id, wait=False)
+        write_status.track('message_ticket', ticket)
+        return True
     except Exception as e:
         st.error(f"An error occurred while saving the message: {str(e)}")
-        st.error(f"Current working directory: {os.getcwd()}")
+        return False
+
+# Connect button and contact form as a fragment: interacting with them reruns only this block,
+# reusing the item the full run already loaded
+@st.fragment
+def contact_section(item):
+    if st.button("Connect"):
+        st.session_state.show_form = True
+
+    if 'show_form' in st.session_state and st.session_state.show_form:
+        with st.form("contact_form"):
+            st.write("Contact Options")
+            contact_method = st.selectbox("Preferred contact method", ["Phone", "Email", "Message"])
+            message = st.text_area("Your Message")
+            submitted = st.form_submit_button("Send Message")
+            if submitted and save_message(item['name'], message, item_id=item.get('item_id')):
+                show_popup()
+                st.balloons()
+                st.session_state.show_form = False
+
+    write_status.show_status(
+        'message_ticket',
+        queued_text="Sending your message...",
+        done_text="Your message has been sent!",
+        failed_text="An error occurred while saving the message"
+    )
+
+# Function to show listings similar to the current one, served from the precomputed similarity table
+@metrics.instrument()
+def show_similar_items(listing_id):
+    similar_ids = recommendations.similar_items(listing_id, limit=SIMILAR_ITEMS)
+    if not similar_ids:
+        return
+    st.subheader("Similar items")
+    cols = st.columns(SIMILAR_ITEMS)
+    for col, similar_id in zip(cols, similar_ids):
+        similar = catalog_loader.get_listing(similar_id)
+        if similar is None:
+            continue
+        with col:
+            asset_manifest.show_image(asset_manifest.grid_image(similar['image_url'], similar['name']), use_column_width=True, alt=similar['name'])
+            price = f"{similar['price']:,.2f}€" if similar['price'] is not None else ""
+            st.markdown(f"**{similar['name']}**  \n{price}")
+            if st.button("View Details", key=f"similar_{similar_id}"):
+                st.query_params['listing_id'] = str(similar_id)
+                st.rerun()
+
+# Function to remember the listings this session looked at, for the home feed
+def record_view(listing_id):
+    viewed = [viewed_id for viewed_id in st.session_state.get('viewed_listing_ids', []) if viewed_id != listing_id]
+    st.session_state['viewed_listing_ids'] = (viewed + [listing_id])[-20:]
 
 # Main function for the app
 def main():
     st.set_page_config(layout="wide")
+    metrics.start_page("item_details")
 
     # Force the light theme
     st.markdown("""
@@ -120,7 +175,7 @@ def main():
 
     col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
     with col1:
-        st.image("logo.png", width=150)
+        asset_manifest.show_image(asset_manifest.full_image("logo.png", "Logo"), width=150)
     with col2:
         st.text_input("Search", key="search_input", label_visibility="collapsed")
     with col3:
@@ -128,14 +183,29 @@ def main():
     with col4:
         st.button("Account")
 
-    # Load the data and print it to the app
-    data = load_data()
-
-    # Get the selected item from session state or default to the first item
-    if 'selected_item' in st.session_state:
-        item = st.session_state.selected_item
+    # Resolve the item by id: from the URL (?listing_id= or ?item_id=), the session, or default to the first listing
+    item = None
+    if 'listing_id' in st.query_params:
+        item = load_item(st.query_params['listing_id'])
+    elif 'item_id' in st.query_params:
+        try:
+            listing = catalog_loader.get_listing_for_item(st.query_params['item_id'])
+        except (TypeError, ValueError):
+            listing = None
+        item = load_item(listing['listing_id']) if listing else None
+    elif 'selected_listing_id' in st.session_state:
+        item = load_item(st.session_state['selected_listing_id'])
     else:
-        item = data.iloc[0].to_dict()
+        listing_id = catalog_store.first_listing_id()
+        item = load_item(listing_id) if listing_id is not None else None
+
+    if item is None:
+        st.error("This item is no longer available.")
+        st.stop()
+
+    # Keep the URL pointing at this item so it can be shared or reloaded
+    st.query_params['listing_id'] = str(item['listing_id'])
+    record_view(item['listing_id'])
 
     # Display item category and name
     st.markdown(f"{item['category']} > {item['name']}")
@@ -143,7 +213,7 @@ def main():
     col1, col2 = st.columns([1, 1])
 
     with col1:
-        st.image(item['image_url'], use_column_width=True, caption=item['name'])
+        asset_manifest.show_image(item['image_url'], use_column_width=True, caption=item['name'])
 
     with col2:
         st.markdown(f"<h2>{item['name']}</h2>", unsafe_allow_html=True)
@@ -151,37 +221,16 @@ def main():
         st.markdown(f"<p>{item['description']}</p>", unsafe_allow_html=True)
         
         st.markdown("<div class='item-details'>", unsafe_allow_html=True)
-        if isinstance(item['details'], dict):
-            for key, value in item['details'].items():
+        for key, value in item['details']:
+            if key:
                 st.markdown(f"<p><strong>{key}:</strong> {value}</p>", unsafe_allow_html=True)
-        elif isinstance(item['details'], str):
-            details_list = item['details'].split(', ')
-            for detail in details_list:
-                parts = detail.split(': ')
-                if len(parts) == 2:
-                    key, value = parts
-                    st.markdown(f"<p><strong>{key}:</strong> {value}</p>", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"<p>{detail}</p>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<p>{item['details']}</p>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<p>{value}</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
         
-        if st.button("Connect"):
-            st.session_state.show_form = True
-
-        if 'show_form' in st.session_state and st.session_state.show_form:
-            with st.form("contact_form"):
-                st.write("Contact Options")
-                contact_method = st.selectbox("Preferred contact method", ["Phone", "Email", "Message"])
-                message = st.text_area("Your Message")
-                submitted = st.form_submit_button("Send Message")
-                if submitted:
-                    save_message_to_csv(item['name'], message)
-                    show_popup()
-                    st.success(f"Your message has been sent via {contact_method}!")
-                    st.balloons()
-                    st.session_state.show_form = False
+        contact_section(item)
+
+    show_similar_items(item['listing_id'])
 
 if __name__ == "__main__":
     main()
@@ -1,27 +1,90 @@
 import streamlit as st
-import pandas as pd
-import os
+
+import catalog_store
+import metrics
 
 st.set_page_config(layout="wide", page_title="Messages")
 
-# Function to load messages from message.csv
-def load_messages():
-    if os.path.exists('message.csv'):
-        return pd.read_csv('message.csv')
-    return pd.DataFrame(columns=['Product Name', 'Message'])
+# Conversations per inbox page, and messages per page of an open conversation
+INBOX_PAGE_SIZE = 20
+THREAD_PAGE_SIZE = 5
+
+# Function to load one page of conversations after the current cursor; fetches one extra row to know if there is a next page
+@metrics.instrument()
+def load_threads(before):
+    threads = catalog_store.inbox_threads(before=before, limit=INBOX_PAGE_SIZE + 1)
+    return threads[:INBOX_PAGE_SIZE], len(threads) > INBOX_PAGE_SIZE
+
+# Cursor stack for the conversation pages: the last entry is the cursor of the page being shown
+def _older(cursor):
+    st.session_state['inbox_cursors'].append(cursor)
+
+def _newer():
+    if len(st.session_state['inbox_cursors']) > 1:
+        st.session_state['inbox_cursors'].pop()
+
+# Per-conversation cursor stacks: the last entry is the id below which the shown messages start
+def _older_messages(thread_id, cursor):
+    st.session_state[f"thread_{thread_id}_cursors"].append(cursor)
+
+def _newer_messages(thread_id):
+    cursors = st.session_state[f"thread_{thread_id}_cursors"]
+    if len(cursors) > 1:
+        cursors.pop()
+
+# Function to render one conversation; its messages are only loaded while it is open
+def show_thread(thread):
+    thread_id = thread['thread_id']
+    label = f"{thread['product_name']} ({thread['total']} message(s))"
+    if thread['unread']:
+        label = f"🔔 {label}, {thread['unread']} unread"
+    if not st.toggle(label, key=f"thread_{thread_id}_open"):
+        return
+    cursors = st.session_state.setdefault(f"thread_{thread_id}_cursors", [None])
+    messages = catalog_store.thread_messages(thread_id, before=cursors[-1], limit=THREAD_PAGE_SIZE + 1)
+    has_more = len(messages) > THREAD_PAGE_SIZE
+    messages = messages[:THREAD_PAGE_SIZE]
+    with st.container(border=True):
+        for message in messages:
+            st.markdown(f"**{message['created_at']}**  \n{message['message']}")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.button("Newer messages", key=f"newer_{thread_id}", on_click=_newer_messages, args=(thread_id,),
+                      disabled=len(cursors) == 1)
+        with col2:
+            st.button("Older messages", key=f"older_{thread_id}", on_click=_older_messages,
+                      args=(thread_id, messages[-1]['message_id'] if messages else None), disabled=not has_more)
+        with col3:
+            if thread['unread']:
+                st.button("Mark as read", key=f"read_{thread_id}",
+                          on_click=catalog_store.mark_messages_read, kwargs={'thread_id': thread_id})
 
 # Main function for the messages page
 def main():
+    metrics.start_page("messages")
     st.header("Messages")
 
-    # Load messages
-    messages_df = load_messages()
-
-    if messages_df.empty:
+    # Totals come from the per-product thread table, not from scanning the message history
+    summary = catalog_store.inbox_summary()
+    if not summary['threads']:
         st.write("No messages found.")
     else:
-        # Display messages in a table
-        st.table(messages_df)
+        st.write(f"{summary['messages']} message(s) in {summary['threads']} conversation(s), {summary['unread']} unread")
+        if summary['unread']:
+            st.button("Mark all as read", on_click=catalog_store.mark_messages_read)
+
+        if 'inbox_cursors' not in st.session_state:
+            st.session_state['inbox_cursors'] = [None]
+        threads, has_more = load_threads(st.session_state['inbox_cursors'][-1])
+        for thread in threads:
+            show_thread(thread)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("Newer conversations", on_click=_newer, disabled=len(st.session_state['inbox_cursors']) == 1)
+        with col2:
+            st.button("Older conversations", on_click=_older, args=(threads[-1]['last_message_id'] if threads else None,),
+                      disabled=not has_more)
 
     # Button to go back to the seller dashboard
     if st.button("Back to Dashboard"):
@@ -0,0 +1,53 @@
+import streamlit as st
+import pandas as pd
+
+import catalog_loader
+import metrics
+
+st.set_page_config(layout="wide", page_title="Metrics")
+
+COLUMNS = ['page', 'step', 'calls', 'seconds', 'avg_ms', 'max_ms', 'rows', 'cache_hits', 'cache_misses', 'cache_hit_rate']
+
+# Function to turn metric rows into a table with averages and cache hit rates, slowest steps first
+def metrics_table(rows):
+    table = pd.DataFrame(rows, columns=[column for column in COLUMNS if column not in ('avg_ms', 'max_ms', 'cache_hit_rate')] + ['max_seconds'])
+    table['avg_ms'] = (table['seconds'] / table['calls'].where(table['calls'] > 0) * 1000).round(2)
+    table['max_ms'] = (table['max_seconds'] * 1000).round(2)
+    lookups = table['cache_hits'] + table['cache_misses']
+    table['cache_hit_rate'] = (table['cache_hits'] / lookups.where(lookups > 0)).round(3)
+    return table[COLUMNS].sort_values('seconds', ascending=False)
+
+# Main function for the metrics page
+def main():
+    st.header("Performance Metrics")
+
+    # Where the last page run of this session spent its time
+    last_run = st.session_state.get('metrics_last_run')
+    if last_run and last_run['steps']:
+        st.subheader(f"Last run: {last_run['page']}")
+        steps = pd.DataFrame(last_run['steps'])
+        steps = steps.groupby('step', sort=False).agg(calls=('seconds', 'size'), ms=('seconds', 'sum'), rows=('rows', 'sum'))
+        steps['ms'] = (steps['ms'] * 1000).round(2)
+        st.dataframe(steps.sort_values('ms', ascending=False))
+
+    st.subheader("This session")
+    session_rows = metrics.session_snapshot()
+    if session_rows:
+        st.dataframe(metrics_table(session_rows), hide_index=True)
+    else:
+        st.write("No timings recorded in this session yet.")
+
+    st.subheader("All sessions")
+    process_rows = metrics.snapshot()
+    if process_rows:
+        st.dataframe(metrics_table(process_rows), hide_index=True)
+    else:
+        st.write("No timings recorded yet.")
+
+    stats = catalog_loader.cache_stats()
+    st.write(f"Catalog cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    st.download_button("Download Prometheus metrics", metrics.prometheus_text(), file_name="metrics.prom", mime="text/plain")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,73 @@
-import os
 import streamlit as st
-import pandas as pd
 
-# Load dummy data
-@st.cache_data
+import asset_manifest
+import attribute_index
+import catalog_loader
+import metrics
+import pagination
+import price_index
+import search_box
+import search_index
+
+# Load the price index over the grid columns of the listed items through the shared loader,
+# which rebuilds it only when the store changed
+@metrics.instrument()
 def load_data():
-    return pd.read_csv("luxury_items.csv")
+    return catalog_loader.load_price_index()
+
+# Function to load the attribute index over the parsed listing details, rebuilt only when the store changed
+@metrics.instrument(count_rows=False)
+def load_attributes():
+    return catalog_loader.load_attribute_index()
+
+def _add_condition(condition):
+    st.session_state['results_conditions'] = st.session_state.get('results_conditions', []) + [condition]
 
-# Function to check if the image path is valid (for local images)
-def is_valid_image_path(image_path):
-    return os.path.exists(image_path)
+def _remove_condition(position):
+    conditions = list(st.session_state.get('results_conditions', []))
+    del conditions[position]
+    st.session_state['results_conditions'] = conditions
+
+# Function to render the detail filters (e.g. Manufacturer = Rolex, Year ≥ 2020): the active ones with a
+# remove button each, and pickers for a new one. Numeric details are filtered by range, others by value.
+def detail_filters(attributes):
+    conditions = st.session_state.get('results_conditions', [])
+    with st.expander(f"Detail filters ({len(conditions)})" if conditions else "Detail filters"):
+        for position, condition in enumerate(conditions):
+            st.button(f"✕ {attribute_index.describe(condition)}", key=f"remove_condition_{position}",
+                      on_click=_remove_condition, args=(position,))
+        names = attributes.attributes()
+        if not names:
+            st.write("No listing details to filter by.")
+            return conditions
+        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+        with col1:
+            attribute = st.selectbox("Detail", names, key="results_attribute")
+        if attributes.is_numeric(attribute):
+            low, high = attributes.bounds(attribute)
+            with col2:
+                min_value = st.number_input("From", value=None, placeholder=f"{low:g}", key="results_attribute_min")
+            with col3:
+                max_value = st.number_input("To", value=None, placeholder=f"{high:g}", key="results_attribute_max")
+            condition = ('range', attribute, min_value, max_value) if min_value is not None or max_value is not None else None
+        else:
+            counts = dict(attributes.values(attribute))
+            with col2:
+                value = st.selectbox("Value", list(counts), format_func=lambda value: f"{value} ({counts[value]})",
+                                     key="results_attribute_value")
+            condition = ('=', attribute, value) if value is not None else None
+        with col4:
+            st.button("Add filter", on_click=_add_condition, args=(condition,), disabled=condition is None)
+    return conditions
+
+# Function to show the results of a new search on this page
+def run_search(query):
+    st.session_state.search_query = query
+    st.rerun()
 
 def main():
     st.set_page_config(layout="wide")
+    metrics.start_page("results")
 
     # Custom CSS to hide the sidebar
     hide_streamlit_style = """
@@ -42,17 +97,21 @@ def main():
     # Header
     col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
     with col1:
-        st.image("logo.png", width=150)
+        asset_manifest.show_image(asset_manifest.full_image("logo.png", "Logo"), width=150)
     with col2:
-        search_query = st.text_input("Search", key="search_input", label_visibility="collapsed")
+        search_box.search_box("search_input", run_search)
     with col3:
         st.button("All Categories")
     with col4:
         st.button("Account")
 
-    # Get search query or category from session state
-    search_query = st.session_state.get("search_query", "")
-    category = st.session_state.get("category", "")
+    # Get search query or category from session state; keep them for this page so paging reruns show the same results
+    if 'search_query' in st.session_state or 'category' in st.session_state:
+        st.session_state.results_query = st.session_state.get("search_query", "")
+        st.session_state.results_category = st.session_state.get("category", "")
+        pagination.reset("results")
+    search_query = st.session_state.get("results_query", "")
+    category = st.session_state.get("results_category", "")
 
     if search_query:
         st.subheader(f"Search Results for '{search_query}'")
@@ -61,36 +120,57 @@ def main():
     else:
         st.subheader("No search query or category provided.")
 
-    data = load_data()
+    # Price range and sort order; changing them starts again from the first page
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        min_price = st.number_input("Min price (€)", min_value=0.0, value=None, step=1000.0, key="results_min_price")
+    with col2:
+        max_price = st.number_input("Max price (€)", min_value=0.0, value=None, step=1000.0, key="results_max_price")
+    with col3:
+        sort_labels = list(price_index.SORT_ORDERS)
+        sort_label = st.selectbox("Sort by", sort_labels, index=0 if search_query else sort_labels.index("Newest"), key="results_sort")
+    conditions = detail_filters(load_attributes())
+    filters = (search_query, category, min_price, max_price, sort_label, tuple(conditions))
+    if filters != st.session_state.get('results_filters'):
+        st.session_state['results_filters'] = filters
+        pagination.reset("results")
 
-    # Filter data based on search query or category
-    if search_query:
-        filtered_data = data[data['name'].str.contains(search_query, case=False) | 
-                             data['category'].str.contains(search_query, case=False)]
-    elif category:
-        filtered_data = data[data['category'] == category]
-    else:
-        filtered_data = data
+    # Filter with vectorized masks over the shared index: ranked hits from the inverted index,
+    # category codes, a binary-searched price range and the intersected detail filters
+    with metrics.timed("filter") as step:
+        index = load_data()
+        ranked_ids = search_index.search(search_query, limit=None) if search_query else None
+        positions = index.query(
+            ranked_ids=ranked_ids,
+            category=category or None,
+            min_price=min_price,
+            max_price=max_price,
+            sort=price_index.SORT_ORDERS[sort_label],
+            rows=load_attributes().query(conditions)
+        )
+        step.rows = len(positions)
 
-    if filtered_data.empty:
+    if not len(positions):
         st.write("No results found.")
     else:
-        # Display filtered recommendations
-        cols = st.columns(3)
-        for i, row in filtered_data.iterrows():
-            with cols[i % 3]:
-                # Check if the image file exists locally or fall back to placeholder
-                image_url = row['image_url'] if is_valid_image_path(row['image_url']) else f"https://via.placeholder.com/200x150.png?text={row['name']}"
+        # Display filtered recommendations, materializing rows and widgets only for the current page
+        start, stop = pagination.paginate(len(positions), key="results")
+        with metrics.timed("render_tiles", rows=stop - start):
+            cols = st.columns(3)
+            for i, (_, row) in enumerate(index.frame.iloc[positions[start:stop]].iterrows()):
+                with cols[i % 3]:
+                    # Resolve the image through the asset manifest or fall back to placeholder
+                    image_url = asset_manifest.grid_image(row['image_url'], row['name'])
                 
-                st.image(image_url, use_column_width=True)
-                st.markdown(f"""
-                **{row['category']}**  
-                {row['name']}  
-                Price: ${row['price']:,.2f}
-                """)
-                if st.button(f"View Details", key=f"view_details_{i}"):
-                    st.session_state.selected_item = row.to_dict()
-                    st.switch_page("pages/item_details.py")
+                    asset_manifest.show_image(image_url, use_column_width=True, alt=row['name'])
+                    st.markdown(f"""
+                    **{row['category']}**  
+                    {row['name']}  
+                    Price: ${row['price']:,.2f}
+                    """)
+                    if st.button(f"View Details", key=f"view_details_{row['listing_id']}"):
+                        st.session_state['selected_listing_id'] = int(row['listing_id'])
+                        st.switch_page("pages/item_details.py")
 
     # Clear session state after displaying results
     if 'search_query' in st.session_state:
@@ -0,0 +1,42 @@
+import math
+import os
+
+import streamlit as st
+
+# Number of tiles per grid page (override with GRID_PAGE_SIZE)
+PAGE_SIZE = int(os.environ.get("GRID_PAGE_SIZE", 12))
+
+
+def _state_key(key):
+    return f"{key}_page"
+
+
+# Function to jump a paginated grid back to its first page (e.g. when the query changes)
+def reset(key):
+    st.session_state[_state_key(key)] = 0
+
+
+def _move(key, step, pages):
+    state_key = _state_key(key)
+    st.session_state[state_key] = min(max(st.session_state.get(state_key, 0) + step, 0), pages - 1)
+
+
+# Function to render previous/next controls and return the (start, stop) row window of the current page.
+# `total` must be a count the caller already has (len of a frame, an index result), never a fresh scan.
+def paginate(total, key, page_size=PAGE_SIZE):
+    pages = max(1, math.ceil(total / page_size))
+    state_key = _state_key(key)
+    page = min(st.session_state.get(state_key, 0), pages - 1)
+    st.session_state[state_key] = page
+
+    if pages > 1:
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            st.button("◀ Previous", key=f"{key}_prev", disabled=page == 0, on_click=_move, args=(key, -1, pages))
+        with col2:
+            st.markdown(f"Page {page + 1} of {pages} ({total} items)")
+        with col3:
+            st.button("Next ▶", key=f"{key}_next", disabled=page >= pages - 1, on_click=_move, args=(key, 1, pages))
+
+    start = page * page_size
+    return start, min(start + page_size, total)
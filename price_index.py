@@ -0,0 +1,136 @@
+import numpy as np
+
+# Sort orders offered on the results page: label -> key
+SORT_ORDERS = {
+    "Relevance": 'relevance',
+    "Price: low to high": 'price_asc',
+    "Price: high to low": 'price_desc',
+    "Newest": 'newest',
+}
+
+
+# Sorted price array over the grid frame's rows, answering range filters by binary search.
+# Every query returns row positions into `frame`, so only the rows of the page being shown are materialized.
+class PriceIndex:
+    def __init__(self, frame):
+        self.frame = frame
+        self.size = len(frame)
+        self.listing_ids = frame['listing_id'].to_numpy(dtype=np.int64, na_value=0)
+        self.prices = prices = frame['price'].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Stable sort keeps equal prices in listing order; rows without a price sort last
+        self.by_price = np.argsort(prices, kind='stable')
+        self.priced = int(np.count_nonzero(~np.isnan(prices)))
+        self.sorted_prices = prices[self.by_price[:self.priced]]
+        self.newest = np.argsort(self.listing_ids, kind='stable')[::-1]
+        self.newest_rank = np.empty(self.size, dtype=np.int64)
+        self.newest_rank[self.newest] = np.arange(self.size)
+        # Listing ids are dense autoincrement keys, so a direct id -> row table beats searching
+        self.row_of = np.full(int(self.listing_ids.max(initial=0)) + 1, -1, dtype=np.int32 if self.size < 2**31 else np.int64)
+        self.row_of[self.listing_ids] = np.arange(self.size)
+        category = frame['category']
+        if hasattr(category, 'cat'):
+            self.category_codes = category.cat.codes.to_numpy()
+            self.category_lookup = {value: code for code, value in enumerate(category.cat.categories)}
+        else:
+            values, uniques = category.factorize()
+            self.category_codes = values
+            self.category_lookup = {value: code for code, value in enumerate(uniques)}
+        # Per-category partitions of the newest and price orders, so a category query only touches its own rows:
+        # code -> (rows newest first, rows by price, sorted prices of the priced rows)
+        newest = _split(self.newest, self.category_codes[self.newest])
+        by_price = _split(self.by_price, self.category_codes[self.by_price])
+        self.partitions = {
+            code: (rows, by_price[code], prices[by_price[code]][~np.isnan(prices[by_price[code]])])
+            for code, rows in newest.items()
+        }
+
+    def __len__(self):
+        return self.size
+
+    # Slice of `by_price` holding the rows priced within [low, high]; either bound may be None
+    def price_slice(self, low=None, high=None):
+        return _price_slice(self.sorted_prices, low, high)
+
+    # Row positions of listing ids (in the given order), dropping ids the frame does not contain
+    def positions(self, listing_ids):
+        listing_ids = np.asarray(listing_ids, dtype=np.int64)
+        listing_ids = listing_ids[(listing_ids >= 0) & (listing_ids < len(self.row_of))]
+        rows = self.row_of[listing_ids].astype(np.int64)
+        return rows[rows >= 0]
+
+    # Filter and order the rows; `ranked_ids` are search hits best first (None when there is no text query)
+    # and `rows` optionally restricts the result to sorted row positions, e.g. from the attribute index
+    def query(self, ranked_ids=None, category=None, min_price=None, max_price=None, sort='relevance', rows=None):
+        if ranked_ids is not None:
+            hits = self.positions(ranked_ids)
+            if rows is not None:
+                hits = hits[np.isin(hits, rows, assume_unique=True)]
+            return self._query_hits(hits, category, min_price, max_price, sort)
+        if rows is not None:
+            # The rows are already narrowed, so filter them alone; without a text query relevance means newest
+            return self._query_hits(np.asarray(rows, dtype=np.int64), category, min_price, max_price,
+                                    'newest' if sort == 'relevance' else sort)
+
+        if category:
+            code = self.category_lookup.get(category)
+            if code not in self.partitions:
+                return np.empty(0, dtype=np.int64)
+            newest, by_price, sorted_prices = self.partitions[code]
+        else:
+            newest, by_price, sorted_prices = self.newest, self.by_price, self.sorted_prices
+        has_range = min_price is not None or max_price is not None
+
+        if sort in ('price_asc', 'price_desc'):
+            # Start from the binary-searched price slice of the partition
+            start, stop = _price_slice(sorted_prices, min_price, max_price)
+            candidates = by_price[start:stop]
+            if sort == 'price_desc':
+                candidates = candidates[::-1]
+            if not has_range:
+                # Unpriced rows still match when no range is set; they go last either way
+                candidates = np.concatenate([candidates, by_price[len(sorted_prices):]])
+            return candidates
+
+        if has_range:
+            prices = self.prices[newest]
+            keep = ~np.isnan(prices)
+            if min_price is not None:
+                keep &= prices >= min_price
+            if max_price is not None:
+                keep &= prices <= max_price
+            return newest[keep]
+        return newest
+
+    def _query_hits(self, hits, category, min_price, max_price, sort):
+        # Text queries already narrowed the rows, so filter and order the hits alone instead of full-size masks
+        keep = np.ones(len(hits), dtype=bool)
+        if category:
+            code = self.category_lookup.get(category)
+            keep &= self.category_codes[hits] == code if code is not None else False
+        prices = self.prices[hits]
+        if min_price is not None:
+            keep &= prices >= min_price
+        if max_price is not None:
+            keep &= prices <= max_price
+        hits, prices = hits[keep], prices[keep]
+        if sort == 'price_asc':
+            return hits[np.argsort(prices, kind='stable')]
+        if sort == 'price_desc':
+            return hits[np.argsort(-prices, kind='stable')]
+        if sort == 'newest':
+            return hits[np.argsort(-self.listing_ids[hits], kind='stable')]
+        return hits
+
+
+def _price_slice(sorted_prices, low=None, high=None):
+    start = 0 if low is None else int(np.searchsorted(sorted_prices, low, side='left'))
+    stop = len(sorted_prices) if high is None else int(np.searchsorted(sorted_prices, high, side='right'))
+    return start, max(start, stop)
+
+
+# Split `rows` by their codes, keeping each code's rows in their original order: {code: rows}
+def _split(rows, codes):
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    return {int(group[0]): rows[members] for group, members in zip(np.split(codes, bounds), np.split(order, bounds)) if len(group)}
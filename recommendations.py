@@ -0,0 +1,257 @@
+import logging
+import math
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+import catalog_store
+from search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Width of the hashed feature space
+DIMENSIONS = 512
+
+# Similar items kept per listing
+TOP_K = 10
+
+# Rows multiplied per batch when building the similarity table
+BLOCK_SIZE = 1024
+
+# Newest listings of the same category compared against a freshly written listing
+CANDIDATES = 2000
+
+# Recently viewed listings whose neighbours lead the home feed
+FEED_VIEWED = 20
+
+# Relative weights of the feature groups
+TEXT_WEIGHT = 1.0
+CATEGORY_WEIGHT = 2.0
+PRICE_WEIGHT = 1.0
+
+# Listing fields fed into the vectorizer
+VECTOR_FIELDS = ['name', 'category', 'description', 'details', 'price']
+
+
+def _bucket(feature):
+    # crc32 rather than hash() so vectors are identical across processes
+    return zlib.crc32(feature.encode('utf-8')) % DIMENSIONS
+
+
+# Function to turn one listing into an L2-normalized feature vector
+def vectorize(listing):
+    weights = {}
+    counts = {}
+    for field in ('name', 'description', 'details'):
+        for token in tokenize(listing.get(field)):
+            counts[token] = counts.get(token, 0) + 1
+    for token, count in counts.items():
+        index = _bucket("t:" + token)
+        weights[index] = weights.get(index, 0.0) + TEXT_WEIGHT * (1 + math.log(count))
+
+    category = listing.get('category')
+    if isinstance(category, str) and category:
+        index = _bucket("c:" + category.lower())
+        weights[index] = weights.get(index, 0.0) + CATEGORY_WEIGHT * max(1.0, math.sqrt(len(counts)))
+
+    price = listing.get('price')
+    if isinstance(price, (int, float)) and not math.isnan(price) and price > 0:
+        # Order-of-magnitude price band, with half weight on the neighbouring bands
+        band = int(math.log10(price))
+        for offset, share in ((0, 1.0), (-1, 0.5), (1, 0.5)):
+            index = _bucket(f"p:{band + offset}")
+            weights[index] = weights.get(index, 0.0) + PRICE_WEIGHT * share * max(1.0, math.sqrt(len(counts)))
+
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    if weights:
+        vector[list(weights)] = list(weights.values())
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+    return vector
+
+
+def _top_k(scores, k):
+    # Indices of the k largest scores per row, sorted descending
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def _vectors(listings):
+    if not listings:
+        return np.empty((0, DIMENSIONS), dtype=np.float32)
+    return np.vstack([vectorize(listing) for listing in listings])
+
+
+# Top-k neighbours of `ids` among `candidate_ids`, compared in blocks to bound memory: {listing_id: [(similar_id, score)]}
+def _neighbours(ids, vectors, candidate_ids, candidate_vectors, k=TOP_K):
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    neighbours = {}
+    for start in range(0, len(ids), BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, len(ids))
+        similarities = vectors[start:stop] @ candidate_vectors.T
+        # A listing is not its own neighbour
+        similarities[candidate_ids[None, :] == np.asarray(ids[start:stop], dtype=np.int64)[:, None]] = -np.inf
+        best = _top_k(similarities, k)
+        scores = np.take_along_axis(similarities, best, axis=1)
+        for row, listing_id in enumerate(ids[start:stop]):
+            neighbours[int(listing_id)] = [
+                (int(candidate_ids[column]), float(score))
+                for column, score in zip(best[row], scores[row]) if np.isfinite(score)
+            ]
+    return neighbours
+
+
+def _category_listings(conn, category, newest=None, including=()):
+    query = "SELECT listing_id, " + ", ".join(VECTOR_FIELDS) + " FROM listings WHERE category IS ?"
+    if newest is None:
+        return [dict(row) for row in conn.execute(query + " ORDER BY listing_id", (category,))]
+    # The newest listings of the category, plus the given listings in case they are older
+    listings = {row['listing_id']: dict(row) for row in conn.execute(query + " ORDER BY listing_id DESC LIMIT ?", (category, newest))}
+    marks = ", ".join("?" * len(including))
+    for row in conn.execute(query + f" AND listing_id IN ({marks})", (category, *including)):
+        listings[row['listing_id']] = dict(row)
+    return list(listings.values())
+
+
+# Function to (re)build the whole similar-listings table; run offline with `python recommendations.py`, or in the
+# background by ensure_table() on the first start against a database that has none, never in a page run.
+# The category carries the largest weight in every vector, so neighbours are searched within each listing's category:
+# the all-pairs products stay per category instead of across the whole catalog.
+def build_table():
+    built = 0
+    with catalog_store.reader() as conn:
+        categories = [row[0] for row in conn.execute("SELECT DISTINCT category FROM listings")]
+    for category in categories:
+        with catalog_store.reader() as conn:
+            listings = _category_listings(conn, category)
+        ids = [listing['listing_id'] for listing in listings]
+        vectors = _vectors(listings)
+        catalog_store.save_similar_listings(_neighbours(ids, vectors, ids, vectors))
+        built += len(ids)
+    catalog_store.mark_similar_listings_built()
+    return built
+
+
+_build_started = set()
+_build_lock = threading.Lock()
+
+
+# Function to start building the similar-listings table in a background thread, once per process and database,
+# if it has never been built for this database; until then the home feed and similar items are empty
+def ensure_table():
+    with _build_lock:
+        if catalog_store.DB_PATH in _build_started:
+            return
+        _build_started.add(catalog_store.DB_PATH)
+    if not catalog_store.similar_listings_built():
+        threading.Thread(target=_build_in_background, name="similar-listings", daemon=True).start()
+
+
+def _build_in_background():
+    try:
+        build_table()
+    except Exception:
+        logger.exception("Building the similar-listings table failed")
+
+
+# Function to compute the neighbours of freshly written listings against the newest CANDIDATES listings of their
+# category, and merge the new listings into those candidates' own top-k. Called from the write path; older listings
+# of the category pick the new ones up at the next full build.
+def add_listings(listing_ids):
+    listing_ids = {int(listing_id) for listing_id in listing_ids}
+    if not listing_ids:
+        return 0
+    neighbours = {}
+    added = 0
+    with catalog_store.reader() as conn:
+        marks = ", ".join("?" * len(listing_ids))
+        categories = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT category FROM listings WHERE listing_id IN ({marks})", sorted(listing_ids)
+        )]
+        for category in categories:
+            candidates = _category_listings(conn, category, newest=CANDIDATES, including=sorted(listing_ids))
+            candidate_ids = [listing['listing_id'] for listing in candidates]
+            candidate_vectors = _vectors(candidates)
+            rows = [position for position, listing_id in enumerate(candidate_ids) if listing_id in listing_ids]
+            new_ids = [candidate_ids[row] for row in rows]
+            neighbours.update(_neighbours(new_ids, candidate_vectors[rows], candidate_ids, candidate_vectors))
+            added += len(new_ids)
+            others = [position for position, listing_id in enumerate(candidate_ids) if listing_id not in listing_ids]
+            neighbours.update(_merge_new(
+                [candidate_ids[row] for row in others], candidate_vectors[others], new_ids, candidate_vectors[rows]
+            ))
+    catalog_store.save_similar_listings(neighbours)
+    return added
+
+
+# Merge new listings into the stored top-k of existing listings; returns the changed lists only
+def _merge_new(ids, vectors, new_ids, new_vectors):
+    if not ids or not new_ids:
+        return {}
+    stored = catalog_store.similar_listings(ids, limit=TOP_K)
+    scores = vectors @ new_vectors.T
+    fresh = set(new_ids)
+    changed = {}
+    for row, listing_id in enumerate(ids):
+        pairs = stored.get(listing_id, [])
+        # Only new listings scoring above the current k-th neighbour can enter the list
+        floor = pairs[-1][1] if len(pairs) >= TOP_K else -np.inf
+        better = [(new_ids[column], float(scores[row, column])) for column in np.flatnonzero(scores[row] > floor)]
+        if better:
+            merged = [pair for pair in pairs if pair[0] not in fresh] + better
+            changed[listing_id] = sorted(merged, key=lambda pair: pair[1], reverse=True)[:TOP_K]
+    return changed
+
+
+# Function to get listing ids similar to a listing, best first, from the precomputed table
+def similar_items(listing_id, limit=TOP_K):
+    ensure_table()
+    return [similar_id for similar_id, _ in catalog_store.similar_listings([listing_id], limit=limit).get(int(listing_id), [])]
+
+
+# Function to rank the neighbours of a session's recently viewed listings for the head of the home feed
+def home_feed(viewed_ids=()):
+    ensure_table()
+    viewed_ids = [int(listing_id) for listing_id in viewed_ids][-FEED_VIEWED:]
+    neighbours = catalog_store.similar_listings(viewed_ids, limit=TOP_K)
+    viewed = set(viewed_ids)
+    scores = {}
+    for rank, listing_id in enumerate(reversed(viewed_ids)):
+        recency = 1.0 / (1 + rank)
+        for neighbour, score in neighbours.get(listing_id, []):
+            if neighbour not in viewed:
+                scores[neighbour] = scores.get(neighbour, 0.0) + recency * score
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+# Function to get rows [start, stop) of the home feed over a price index's frame: the ranked neighbours first,
+# then every other listing newest first. Only the requested page is computed.
+def feed_rows(index, ranked_ids, start, stop):
+    first = index.positions(ranked_ids)
+    head = first[start:stop]
+    wanted = stop - start - len(head)
+    if wanted <= 0:
+        return head
+    # Map the first wanted position of "newest without the neighbours" back into the newest order
+    skipped = np.sort(index.newest_rank[first])
+    offset = max(0, start - len(first))
+    position = offset
+    while True:
+        moved = offset + int(np.searchsorted(skipped, position, side='right'))
+        if moved == position:
+            break
+        position = moved
+    tail = index.newest[position:position + wanted + len(skipped)]
+    tail = tail[~np.isin(tail, first)][:wanted]
+    return np.concatenate([head, tail])
+
+
+if __name__ == "__main__":
+    print(f"Stored neighbours for {build_table()} listings", file=sys.stderr)
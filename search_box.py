@@ -0,0 +1,36 @@
+import streamlit as st
+
+import typeahead
+
+# Suggestion buttons shown under a search box
+SUGGESTION_COLUMNS = 4
+
+def _submitted(key):
+    st.session_state[f"{key}_submitted"] = True
+
+# Function to render a search box with typeahead suggestions. Pressing enter searches for the typed text;
+# suggestions for it are offered underneath. It runs as a fragment, so picking a suggestion only reruns the box
+# until `on_search(query)` is called with the submitted or picked phrase.
+@st.fragment
+def search_box(key, on_search, placeholder=""):
+    # After a search the box shows the phrase that was searched, also on the page the search opened
+    if f"{key}_searched" in st.session_state:
+        st.session_state[key] = st.session_state.pop(f"{key}_searched")
+    text = st.text_input("Search", key=key, placeholder=placeholder, label_visibility="collapsed",
+                         on_change=_submitted, args=(key,))
+    picked = None
+    if st.session_state.pop(f"{key}_submitted", False) and text.strip():
+        picked = text.strip()
+    elif text.strip():
+        suggestions = [phrase for phrase in typeahead.suggest(text)
+                       if typeahead.normalize(phrase) != typeahead.normalize(text)]
+        cols = st.columns(SUGGESTION_COLUMNS)
+        for position, phrase in enumerate(suggestions):
+            with cols[position % SUGGESTION_COLUMNS]:
+                if st.button(phrase, key=f"{key}_suggestion_{position}"):
+                    picked = phrase
+
+    if picked:
+        st.session_state[f"{key}_searched"] = picked
+        typeahead.record_search(picked)
+        on_search(picked)
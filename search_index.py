@@ -0,0 +1,176 @@
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import catalog_store
+
+# Listing fields that are indexed for full-text search
+INDEXED_FIELDS = ['name', 'category', 'description', 'details']
+
+# BM25 tuning parameters
+K1 = 1.2
+B = 0.75
+
+# Seconds between checks of the store for listings written by other processes; writes made in this process
+# are indexed right away through catch_up()
+REFRESH_INTERVAL = 2.0
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+# Reduce simple English plurals so "watches" matches "watch" and "bags" matches "bag"
+def _stem(token):
+    if len(token) > 4 and token.endswith('es') and token[:-2].endswith(('ch', 'sh', 'x', 'ss')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+# Function to split text into normalized search terms
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+# Inverted index over listings with BM25 ranking
+class SearchIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.doc_lengths = {}
+        self.total_length = 0
+        self.last_listing_id = 0
+        self.refreshed_at = None
+        # Scoring works on arrays: term -> (sorted doc ids, term frequencies), rebuilt when the term's postings change,
+        # and document lengths indexed by doc id
+        self.arrays = {}
+        self.lengths = np.zeros(1024, dtype=np.float64)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    # Add (or replace) one listing in the index
+    def add_document(self, doc_id, fields):
+        terms = []
+        for field in INDEXED_FIELDS:
+            terms.extend(tokenize(fields.get(field)))
+        with self.lock:
+            if doc_id in self.doc_lengths:
+                self.remove_document(doc_id)
+            counts = defaultdict(int)
+            for term in terms:
+                counts[term] += 1
+            for term, count in counts.items():
+                self.postings[term][doc_id] = count
+                self.arrays.pop(term, None)
+            self.doc_lengths[doc_id] = len(terms)
+            if doc_id >= len(self.lengths):
+                self.lengths = np.concatenate([self.lengths, np.zeros(max(doc_id + 1, 2 * len(self.lengths)) - len(self.lengths))])
+            self.lengths[doc_id] = len(terms)
+            self.total_length += len(terms)
+
+    def remove_document(self, doc_id):
+        with self.lock:
+            length = self.doc_lengths.pop(doc_id, None)
+            if length is None:
+                return
+            self.total_length -= length
+            for term in list(self.postings):
+                docs = self.postings[term]
+                if docs.pop(doc_id, None) is not None:
+                    self.arrays.pop(term, None)
+                    if not docs:
+                        del self.postings[term]
+
+    def _term_arrays(self, term):
+        arrays = self.arrays.get(term)
+        if arrays is None:
+            docs = self.postings[term]
+            doc_ids = np.fromiter(docs.keys(), dtype=np.int64, count=len(docs))
+            tfs = np.fromiter(docs.values(), dtype=np.float64, count=len(docs))
+            order = np.argsort(doc_ids)
+            arrays = self.arrays[term] = (doc_ids[order], tfs[order])
+        return arrays
+
+    # Return up to `limit` doc ids and their scores as arrays ranked by BM25 (all matches when limit is None); every query term must match
+    def search(self, query, limit=100):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        with self.lock:
+            if any(not self.postings.get(term) for term in terms):
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            postings = sorted((self._term_arrays(term) for term in terms), key=lambda arrays: len(arrays[0]))
+            # Intersect starting from the rarest term to keep the candidate set small
+            candidates = postings[0][0]
+            for doc_ids, _ in postings[1:]:
+                candidates = candidates[np.isin(candidates, doc_ids, assume_unique=True)]
+                if not len(candidates):
+                    return candidates, np.empty(0)
+
+            total_docs = len(self.doc_lengths)
+            average_length = self.total_length / total_docs if total_docs else 0.0
+            if average_length:
+                norm = K1 * (1 - B + B * self.lengths[candidates] / average_length)
+            else:
+                norm = np.full(len(candidates), K1)
+            scores = np.zeros(len(candidates))
+            for doc_ids, tfs in postings:
+                idf = math.log(1 + (total_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                tf = tfs[np.searchsorted(doc_ids, candidates)]
+                scores += idf * tf * (K1 + 1) / (tf + norm)
+        if limit is not None and limit < len(candidates):
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[best], scores[best]
+        order = np.argsort(-scores)
+        return candidates[order], scores[order]
+
+    # Index any listings added to the store since the last refresh. `last_listing_id` is only moved here,
+    # after reading every committed listing up to it, so listings committed by other writers are never skipped.
+    def refresh(self):
+        self.refreshed_at = time.monotonic()
+        with catalog_store.reader() as conn:
+            rows = conn.execute(
+                "SELECT listing_id, " + ", ".join(INDEXED_FIELDS) + " FROM listings WHERE listing_id > ? ORDER BY listing_id",
+                (self.last_listing_id,)
+            ).fetchall()
+        for row in rows:
+            self.add_document(row['listing_id'], dict(row))
+        if rows:
+            with self.lock:
+                self.last_listing_id = max(self.last_listing_id, rows[-1]['listing_id'])
+        return len(rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# Function to get the process-wide search index, built once and caught up incrementally at most every REFRESH_INTERVAL
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        if _index.refreshed_at is None or time.monotonic() - _index.refreshed_at >= REFRESH_INTERVAL:
+            _index.refresh()
+    return _index
+
+
+# Function to index freshly written listings without waiting for the next search, if this process built the index
+def catch_up():
+    with _index_lock:
+        if _index is not None:
+            _index.refresh()
+
+
+# Function to search listings, returning listing ids in rank order
+def search(query, limit=100):
+    doc_ids, _ = get_index().search(query, limit=limit)
+    return doc_ids.tolist()
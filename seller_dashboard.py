@@ -1,25 +1,134 @@
 import streamlit as st
 import pandas as pd
-import os
+
+import asset_manifest
+import bulk_list
+import catalog_loader
+import metrics
+import pagination
+import search_box
+import write_queue
+import write_status
 
 st.set_page_config(layout="wide", page_title="Seller Dashboard")
 
-# Function to load data from all_items.csv
+# Function to load the seller's inventory through the shared loader
+@metrics.instrument()
 def load_all_items():
-    if os.path.exists('all_items.csv'):
-        return pd.read_csv('all_items.csv')
-    return pd.DataFrame(columns=['item_id', 'name', 'category', 'image_url', 'listed'])
-
-# Function to check for messages (from message.csv)
-def check_messages(item_name):
-    if os.path.exists('message.csv'):
-        messages = pd.read_csv('message.csv')
-        if item_name in messages['Product Name'].values:
-            return True
-    return False
+    return catalog_loader.load_all_items()
+
+# Per-item message counts, computed in one grouped query and recomputed only when the message store changes
+@metrics.instrument()
+def load_message_counts():
+    return catalog_loader.message_counts()
+
+# Function to look up the message counts for an item
+@metrics.instrument(count_rows=False)
+def check_messages(item_id, message_counts):
+    return message_counts.get(int(item_id), {'total': 0, 'unread': 0})
+
+# Function to filter the dashboard by a search
+def filter_items(query):
+    st.session_state['dashboard_search'] = query
+    st.rerun()
+
+def _clear_search():
+    st.session_state.pop('dashboard_search', None)
+    st.session_state['dashboard_search_input'] = ""
+
+# Function to render the message notice on a tile
+def show_message_notice(counts):
+    if counts['unread']:
+        st.markdown(f"**🔔 {counts['unread']} unread of {counts['total']} message(s) regarding this item!**")
+    elif counts['total']:
+        st.markdown(f"✉️ {counts['total']} message(s) regarding this item")
+
+# "List item" button as a fragment, so a click reruns only the button before switching pages instead of every tile
+@st.fragment
+def list_button(item_id, name):
+    if st.button(f"List item: {name}", key=f"list_button_{item_id}"):
+        st.session_state['selected_item_id'] = int(item_id)
+        st.switch_page("pages/1_List_Item.py")
+
+# Items picked for bulk listing, {item_id: name}, kept across pages of the Not Listed grid
+def _bulk_selection():
+    return st.session_state.setdefault('bulk_selected', {})
+
+def _toggle_bulk(item_id, name):
+    selected = _bulk_selection()
+    if st.session_state[f"bulk_pick_{item_id}"]:
+        selected[item_id] = name
+    else:
+        selected.pop(item_id, None)
+
+def _clear_bulk():
+    for item_id in _bulk_selection():
+        st.session_state.pop(f"bulk_pick_{item_id}", None)
+    st.session_state['bulk_selected'] = {}
+
+# Checkbox on a Not Listed tile that adds the item to the bulk listing selection
+def bulk_checkbox(item_id, name):
+    item_id = int(item_id)
+    st.checkbox("Select for bulk listing", value=item_id in _bulk_selection(), key=f"bulk_pick_{item_id}",
+                on_change=_toggle_bulk, args=(item_id, name))
+
+def _listed_count(results):
+    listed = sum(result['status'] == 'listed' for result in results)
+    return f"Listed {listed} of {len(results)} items"
+
+def _show_report(results):
+    st.dataframe(pd.DataFrame(results)[['item_id', 'status', 'listing_id', 'message']], hide_index=True)
+
+# Function to render the bulk listing form for the items ticked on the Not Listed tiles: set prices and descriptions,
+# and queue them as one batch on the background write queue. Only the selection is read, never the whole inventory.
+def bulk_listing_section():
+    selected = _bulk_selection()
+    with st.expander(f"Bulk list items ({len(selected)} selected)", expanded='bulk_ticket' in st.session_state):
+        write_status.show_status('bulk_ticket', queued_text="Listing the selected items...", done_text=_listed_count,
+                                 failed_text="Error listing items", show_result=_show_report)
+        if not selected:
+            st.write("Tick \"Select for bulk listing\" on the Not Listed items to list them together.")
+            return
+        st.button("Clear selection", on_click=_clear_bulk)
+        selected_ids = list(selected)
+        labels = {item_id: f"{name} (#{item_id})" for item_id, name in selected.items()}
+        with st.form(key="bulk_list_form"):
+            entries = st.data_editor(
+                pd.DataFrame({
+                    'item_id': selected_ids,
+                    'name': [labels[item_id] for item_id in selected_ids],
+                    'price': [0.0] * len(selected_ids),
+                    'description': [''] * len(selected_ids),
+                }),
+                column_config={
+                    'item_id': None,
+                    'name': st.column_config.TextColumn("Item", disabled=True),
+                    'price': st.column_config.NumberColumn("Price (€)", min_value=0.0, step=0.01),
+                    'description': st.column_config.TextColumn("Description"),
+                },
+                hide_index=True,
+                use_container_width=True,
+            )
+            hide_fields = st.multiselect("Select fields to hide from the buyer", options=bulk_list.HIDEABLE_FIELDS)
+            seller_details = st.text_input("Seller details (optional)")
+            if st.form_submit_button("List selected items"):
+                ticket = write_queue.submit('bulk_list', [
+                    {
+                        'item_id': row['item_id'],
+                        'price': row['price'],
+                        'description': row['description'] or '',
+                        'hide_fields': hide_fields,
+                        'seller_details': seller_details,
+                    }
+                    for _, row in entries.iterrows()
+                ])
+                write_status.track('bulk_ticket', ticket)
+                _clear_bulk()
+                st.rerun()
 
 # Main function for the seller's dashboard page
 def main():
+    metrics.start_page("seller_dashboard")
     # Custom CSS to enforce light theme and button styles with proper alignment
     st.markdown("""
     <style>
@@ -64,23 +173,37 @@ def main():
     # Header section with logo and Messages button
     col1, col2, col3 = st.columns([1, 3, 1])  # Adjust column ratios
     with col1:
-        st.image("logo.png", width=100)  # Add logo to the left of the search bar
+        asset_manifest.show_image(asset_manifest.full_image("logo.png", "Logo"), width=100)  # Add logo to the left of the search bar
     with col2:
-        search_query = st.text_input("Search for an item", value="", label_visibility="collapsed")
+        search_box.search_box("dashboard_search_input", filter_items, placeholder="Search for an item")
     with col3:
         if st.button("Messages"):
             st.switch_page("pages/messages.py")
 
     st.write("Manage your items and listings")
 
-    # Load items from all_items.csv
+    search_query = st.session_state.get('dashboard_search', "")
+    if search_query:
+        st.write(f"Showing items matching '{search_query}'")
+        st.button("Clear search", on_click=_clear_search)
+
+    # Load items from the catalog store
     items_df = load_all_items()
+    message_counts = load_message_counts()
 
     # Filter based on search query
-    if search_query:
-        filtered_items = items_df[items_df['name'].str.contains(search_query, case=False)]
-    else:
-        filtered_items = items_df
+    if search_query != st.session_state.get('dashboard_query'):
+        st.session_state['dashboard_query'] = search_query
+        pagination.reset("listed_items")
+        pagination.reset("not_listed_items")
+    with metrics.timed("filter") as step:
+        if search_query:
+            filtered_items = items_df[items_df['name'].str.contains(search_query, case=False, regex=False)]
+        else:
+            filtered_items = items_df
+        step.rows = len(filtered_items)
+
+    bulk_listing_section()
 
     # Split items into listed and not listed
     listed_items = filtered_items[filtered_items['listed'] == True]
@@ -89,70 +212,63 @@ def main():
     # Display Listed items
     st.markdown('<div class="section-header">Listed Items</div>', unsafe_allow_html=True)
     if not listed_items.empty:
-        cols = st.columns(3)  # Create 3 columns for tiles
-        for index, row in listed_items.iterrows():
-            col = cols[index % 3]  # Distribute items evenly across columns
-            with col:
-                with st.container():
-                    st.markdown('<div class="item-box">', unsafe_allow_html=True)
-                    st.markdown(f"### {row['name']}")
+        start, stop = pagination.paginate(len(listed_items), key="listed_items")
+        with metrics.timed("render_tiles", rows=stop - start):
+            cols = st.columns(3)  # Create 3 columns for tiles
+            for position, (_, row) in enumerate(listed_items.iloc[start:stop].iterrows()):
+                col = cols[position % 3]  # Distribute items evenly across columns
+                with col:
+                    with st.container():
+                        st.markdown('<div class="item-box">', unsafe_allow_html=True)
+                        st.markdown(f"### {row['name']}")
                     
-                    # Check if the image URL is available and valid
-                    if pd.notna(row['image_url']) and row['image_url'] != "":
-                        image_url = row['image_url']  # Use image URL from the CSV
-                    else:
-                        image_url = f"https://via.placeholder.com/200x200.png?text={row['name']}"  # Use placeholder
-
-                    # Display the image with fixed width and ensure centering using Streamlit
-                    st.image(image_url, width=150, use_column_width=False)
-
-                    st.markdown(f"**Category:** {row['category']}")
-
-                    # Show notification if there's a message for this item
-                    if check_messages(row['name']):
-                        st.markdown(f"**🔔 You have messages regarding this item!** ")
-
-                    # Center the button under the image
-                    if st.button(f"List item: {row['name']}", key=f"list_button_{row['item_id']}"):
-                        st.session_state['selected_item_id'] = str(row['item_id'])
-                        st.switch_page("pages/1_List_Item.py")
-                    st.markdown('</div>', unsafe_allow_html=True)  # Close item-box div
-                st.markdown("---")
+                        # Resolve the image through the asset manifest (thumbnail, or placeholder if missing)
+                        image_url = asset_manifest.grid_image(row['image_url'], row['name'], placeholder_size="200x200")
+
+                        # Display the image with fixed width and ensure centering using Streamlit
+                        asset_manifest.show_image(image_url, width=150, alt=row['name'])
+
+                        st.markdown(f"**Category:** {row['category']}")
+
+                        # Show notification if there are messages for this item
+                        show_message_notice(check_messages(row['item_id'], message_counts))
+
+                        # Center the button under the image
+                        list_button(row['item_id'], row['name'])
+                        st.markdown('</div>', unsafe_allow_html=True)  # Close item-box div
+                    st.markdown("---")
     else:
         st.write("No listed items found.")
 
     # Display Not Listed items
     st.markdown('<div class="section-header">Not Listed Items</div>', unsafe_allow_html=True)
     if not not_listed_items.empty:
-        cols = st.columns(3)  # Create 3 columns for tiles
-        for index, row in not_listed_items.iterrows():
-            col = cols[index % 3]  # Distribute items evenly across columns
-            with col:
-                with st.container():
-                    st.markdown('<div class="item-box">', unsafe_allow_html=True)
-                    st.markdown(f"### {row['name']}")
+        start, stop = pagination.paginate(len(not_listed_items), key="not_listed_items")
+        with metrics.timed("render_tiles", rows=stop - start):
+            cols = st.columns(3)  # Create 3 columns for tiles
+            for position, (_, row) in enumerate(not_listed_items.iloc[start:stop].iterrows()):
+                col = cols[position % 3]  # Distribute items evenly across columns
+                with col:
+                    with st.container():
+                        st.markdown('<div class="item-box">', unsafe_allow_html=True)
+                        st.markdown(f"### {row['name']}")
                     
-                    # Check if the image URL is available and valid
-                    if pd.notna(row['image_url']) and row['image_url'] != "":
-                        image_url = row['image_url']  # Use image URL from the CSV
-                    else:
-                        image_url = f"https://via.placeholder.com/200x200.png?text={row['name']}"  # Use placeholder
-
-                    # Display the image with fixed width and ensure centering using Streamlit
-                    st.image(image_url, width=150, use_column_width=False)
-
-                    st.markdown(f"**Category:** {row['category']}")
-
-                    # Show notification if there's a message for this item
-                    if check_messages(row['name']):
-                        st.markdown(f"**🔔 You have messages regarding this item!** ")
-
-                    # Center the button under the image
-                    if st.button(f"List item: {row['name']}", key=f"list_button_{row['item_id']}"):
-                        st.session_state['selected_item_id'] = str(row['item_id'])
-                        st.switch_page("pages/1_List_Item.py")
-                    st.markdown('</div>', unsafe_allow_html=True)  # Close item-box div
-                st.markdown("---")
+                        # Resolve the image through the asset manifest (thumbnail, or placeholder if missing)
+                        image_url = asset_manifest.grid_image(row['image_url'], row['name'], placeholder_size="200x200")
+
+                        # Display the image with fixed width and ensure centering using Streamlit
+                        asset_manifest.show_image(image_url, width=150, alt=row['name'])
+
+                        st.markdown(f"**Category:** {row['category']}")
+
+                        # Show notification if there are messages for this item
+                        show_message_notice(check_messages(row['item_id'], message_counts))
+
+                        # Center the button under the image
+                        list_button(row['item_id'], row['name'])
+                        bulk_checkbox(row['item_id'], row['name'])
+                        st.markdown('</div>', unsafe_allow_html=True)  # Close item-box div
+                    st.markdown("---")
     else:
         st.write("No unlisted items found.")
 
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+import attribute_index
+import price_index
+
+
+# Listings 1-5 sit in rows 0-4 of the grid frame; listing 9 is not in the frame
+def _index():
+    frame = pd.DataFrame({
+        'listing_id': pd.array([1, 2, 3, 4, 5], dtype='Int64'),
+        'price': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'category': pd.Series(['Watches'] * 5, dtype='category'),
+    })
+    rows = [
+        (1, 'Manufacturer', 'Rolex', None), (1, 'Year', '2020', 2020.0), (1, 'Color', 'Gold', None),
+        (2, 'Manufacturer', 'Rolex', None), (2, 'Year', '2018', 2018.0),
+        (3, 'Manufacturer', 'Omega', None), (3, 'Year', '2021', 2021.0), (3, 'Color', 'Steel', None),
+        (4, 'Manufacturer', 'Rolex', None), (4, 'Year', 'unknown', None),
+        (5, 'Year', '2022', 2022.0),
+        (9, 'Manufacturer', 'Rolex', None),
+    ]
+    attributes = pd.DataFrame(rows, columns=['listing_id', 'attribute', 'value', 'number'])
+    return attribute_index.AttributeIndex(price_index.PriceIndex(frame), attributes)
+
+
+def test_values_and_bounds():
+    index = _index()
+    assert index.attributes() == ['Year', 'Manufacturer', 'Color']
+    assert index.values('Manufacturer') == [('Rolex', 3), ('Omega', 1)]
+    # Four of five Year values are numbers, which meets NUMERIC_SHARE
+    assert index.is_numeric('Year')
+    assert not index.is_numeric('Color')
+    assert index.bounds('Year') == (2018.0, 2022.0)
+    assert index.bounds('Color') is None
+
+
+def test_equals_drops_listings_missing_from_the_frame():
+    assert _index().equals('Manufacturer', 'Rolex').tolist() == [0, 1, 3]
+    assert _index().equals('Manufacturer', 'Seiko').tolist() == []
+
+
+def test_open_and_closed_ranges():
+    index = _index()
+    assert index.between('Year', 2019).tolist() == [0, 2, 4]
+    assert index.between('Year', high=2020).tolist() == [0, 1]
+    assert index.between('Year', 2020, 2021).tolist() == [0, 2]
+    assert index.between('Year', 2023).tolist() == []
+    assert index.between('Color', 0, 1).tolist() == []
+
+
+def test_query_intersects_every_condition():
+    index = _index()
+    assert index.query([]) is None
+    assert index.query([('=', 'Manufacturer', 'Rolex'), ('range', 'Year', 2019, None)]).tolist() == [0]
+    assert index.query([('=', 'Manufacturer', 'Rolex'), ('range', 'Year', None, 2020)]).tolist() == [0, 1]
+    assert index.query([('=', 'Manufacturer', 'Omega'), ('range', 'Year', None, 2019)]).tolist() == []
+    assert index.query([('=', 'Color', 'Gold'), ('=', 'Manufacturer', 'Rolex'), ('range', 'Year', 2020, 2020)]).tolist() == [0]
+    assert isinstance(index.query([('=', 'Manufacturer', 'Rolex')]), np.ndarray)
+
+
+def test_describe():
+    assert attribute_index.describe(('=', 'Manufacturer', 'Rolex')) == "Manufacturer = Rolex"
+    assert attribute_index.describe(('range', 'Year', 2019.0, None)) == "Year ≥ 2019"
+    assert attribute_index.describe(('range', 'Year', None, 2020.0)) == "Year ≤ 2020"
+    assert attribute_index.describe(('range', 'Year', 2019.0, 2020.0)) == "2019 ≤ Year ≤ 2020"
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import price_index
+
+
+# Rows 0-5 hold listings 1-6; listing 3 has no price
+def _index():
+    return price_index.PriceIndex(pd.DataFrame({
+        'listing_id': pd.array([1, 2, 3, 4, 5, 6], dtype='Int64'),
+        'price': [300.0, 100.0, np.nan, 100.0, 500.0, 200.0],
+        'category': pd.Series(['Cars', 'Watches', 'Cars', 'Cars', 'Watches', 'Cars'], dtype='category'),
+    }))
+
+
+def test_browsing_lists_newest_first():
+    index = _index()
+    assert index.query().tolist() == [5, 4, 3, 2, 1, 0]
+    assert index.query(category='Cars').tolist() == [5, 3, 2, 0]
+    assert index.query(category='Boats').tolist() == []
+
+
+def test_price_sorts_put_unpriced_rows_last_unless_a_range_is_set():
+    index = _index()
+    assert index.query(category='Cars', sort='price_asc').tolist() == [3, 5, 0, 2]
+    assert index.query(category='Cars', sort='price_desc').tolist() == [0, 5, 3, 2]
+    # Equal prices keep listing order
+    assert index.query(min_price=100, max_price=300, sort='price_asc').tolist() == [1, 3, 5, 0]
+    assert index.query(category='Cars', max_price=250, sort='price_desc').tolist() == [5, 3]
+
+
+def test_price_range_without_price_sort_keeps_newest_order():
+    index = _index()
+    assert index.query(min_price=200).tolist() == [5, 4, 0]
+    assert index.query(category='Watches', max_price=100).tolist() == [1]
+
+
+def test_ranked_hits_keep_their_order_and_drop_unknown_ids():
+    index = _index()
+    assert index.query(ranked_ids=[5, 99, 1, 3]).tolist() == [4, 0, 2]
+    assert index.query(ranked_ids=[5, 99, 1, 3], category='Cars').tolist() == [0, 2]
+    assert index.query(ranked_ids=[5, 1, 3], rows=np.array([0, 1, 2, 3])).tolist() == [0, 2]
+    assert index.query(ranked_ids=[1, 4, 6], sort='price_asc').tolist() == [3, 5, 0]
+    assert index.query(ranked_ids=[1, 4, 6], sort='newest').tolist() == [5, 3, 0]
+    assert index.query(ranked_ids=[1, 2], category='Boats').tolist() == []
+
+
+def test_restricted_rows_without_text_query_sort_by_newest():
+    index = _index()
+    rows = np.array([0, 2, 4])
+    assert index.query(rows=rows).tolist() == [4, 2, 0]
+    assert index.query(rows=rows, min_price=200).tolist() == [4, 0]
+    assert index.query(rows=rows, category='Cars', sort='price_desc').tolist() == [0, 2]
@@ -0,0 +1,30 @@
+import catalog_store
+import search_index
+import bulk_list
+
+
+def _use_fresh_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(catalog_store, 'DB_PATH', str(tmp_path / 'marketplace.db'))
+    monkeypatch.setattr(bulk_list.catalog_snapshot, 'SNAPSHOT_DIR', str(tmp_path / 'catalog'))
+    monkeypatch.setattr(search_index, '_index', None)
+    with catalog_store.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO items (item_id, name, category, image_url, listed) VALUES (?, ?, 'Cars', '', 0)",
+            [(1, 'First car'), (2, 'Second car')]
+        )
+
+
+def test_listing_written_elsewhere_is_not_skipped_by_bulk_listing(tmp_path, monkeypatch):
+    _use_fresh_store(tmp_path, monkeypatch)
+    search_index.get_index()
+
+    # Written by another writer, which does not touch this process's index
+    catalog_store.list_item(1, 'First car', 'Cars', 'zzzuniqueword', 1.0, '', '', [], '')
+    # Written through the bulk path with a higher listing id
+    results = bulk_list.bulk_list([{'item_id': 2, 'price': 2.0, 'description': 'other'}])
+    assert results[0]['status'] == 'listed'
+
+    first = catalog_store.get_listing_for_item(1)['listing_id']
+    assert search_index.search('zzzuniqueword') == [first]
+    assert search_index.search('other') == [results[0]['listing_id']]
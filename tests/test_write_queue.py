@@ -0,0 +1,83 @@
+import pytest
+
+import bulk_list
+import catalog_store
+import search_index
+import write_queue
+
+
+def _use_fresh_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(catalog_store, 'DB_PATH', str(tmp_path / 'marketplace.db'))
+    monkeypatch.setattr(bulk_list.catalog_snapshot, 'SNAPSHOT_DIR', str(tmp_path / 'catalog'))
+    monkeypatch.setattr(search_index, '_index', None)
+    with catalog_store.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO items (item_id, name, category, image_url, listed) VALUES (?, ?, 'Cars', '', 0)",
+            [(1, 'First car'), (2, 'Second car'), (3, 'Third car')]
+        )
+
+
+def _count(table):
+    with catalog_store.reader() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_failing_batch_is_rolled_back_and_fails_every_ticket(tmp_path, monkeypatch):
+    _use_fresh_store(tmp_path, monkeypatch)
+
+    def insert_then_fail(payloads):
+        with catalog_store.transaction() as conn:
+            conn.executemany("INSERT INTO items (item_id, name) VALUES (?, ?)", payloads)
+            raise RuntimeError("disk full")
+
+    queue = write_queue.WriteQueue(flush_interval=60, handlers={
+        'broken': insert_then_fail,
+        'message': write_queue.HANDLERS['message'],
+    })
+    tickets = [queue.submit('broken', (10, 'Ten')), queue.submit('broken', (11, 'Eleven'))]
+    message = queue.submit('message', ('First car', 'Still available?', 1))
+    assert [ticket.status for ticket in tickets + [message]] == ['queued'] * 3
+    queue.flush()
+
+    assert [ticket.status for ticket in tickets] == ['failed', 'failed']
+    with pytest.raises(RuntimeError, match="disk full"):
+        tickets[0].wait(timeout=1)
+    assert _count('items') == 3
+    # Commands of another kind in the same batch are applied in their own transaction
+    assert message.status == 'done'
+    assert _count('messages') == 1
+
+
+def test_rejected_listing_fails_only_its_own_ticket(tmp_path, monkeypatch):
+    _use_fresh_store(tmp_path, monkeypatch)
+    queue = write_queue.WriteQueue(flush_interval=60)
+    good = queue.submit('list_item', {'item_id': 1, 'price': 1.0})
+    missing = queue.submit('list_item', {'item_id': 99, 'price': 1.0})
+    queue.flush()
+
+    assert good.status == 'done' and good.wait(timeout=1)['status'] == 'listed'
+    assert missing.status == 'failed'
+    assert str(missing.error) == "Item not found in the catalog"
+
+
+def test_bulk_commands_share_a_transaction_and_get_their_own_reports(tmp_path, monkeypatch):
+    _use_fresh_store(tmp_path, monkeypatch)
+    queue = write_queue.WriteQueue(flush_interval=60)
+    first = queue.submit('bulk_list', [{'item_id': 1, 'price': 1.0}, {'item_id': 99, 'price': 1.0}])
+    second = queue.submit('bulk_list', [{'item_id': 2, 'price': 2.0}])
+    queue.flush()
+
+    assert [result['status'] for result in first.wait(timeout=1)] == ['listed', 'not_found']
+    assert [(result['item_id'], result['status']) for result in second.wait(timeout=1)] == [(2, 'listed')]
+    assert _count('listings') == 2
+
+
+def test_zero_interval_applies_on_the_callers_thread(tmp_path, monkeypatch):
+    _use_fresh_store(tmp_path, monkeypatch)
+    queue = write_queue.WriteQueue(flush_interval=0)
+    ticket = queue.submit('message', ('First car', 'Hello', 1))
+    assert ticket.status == 'done'
+    assert queue.worker is None
+    with pytest.raises(ValueError):
+        queue.submit('unknown', {})
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# Directory holding generated derivatives (override with THUMBNAIL_DIR)
+THUMBNAIL_DIR = os.environ.get("THUMBNAIL_DIR", ".thumbnails")
+
+# Bounding box for grid thumbnails; the grids draw images at 150-400 px wide
+THUMBNAIL_SIZE = (400, 400)
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_QUALITY = 80
+
+# (path, mtime, size) -> content hash, so unchanged originals are hashed only once per process
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+# Function to compute the content hash of an image file
+def content_hash(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    with _hash_lock:
+        _hash_cache[key] = digest.hexdigest()
+    return _hash_cache[key]
+
+
+# Function to build the cache path of a derivative for a given content hash and size
+def thumbnail_path(digest, size=THUMBNAIL_SIZE):
+    return os.path.join(THUMBNAIL_DIR, f"{digest[:20]}_{size[0]}x{size[1]}.{THUMBNAIL_FORMAT.lower()}")
+
+
+# Function to resize one image into the derivative cache; returns the derivative path
+def generate_thumbnail(path, size=THUMBNAIL_SIZE):
+    target = thumbnail_path(content_hash(path), size)
+    if os.path.exists(target):
+        return target
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    with Image.open(path) as image:
+        image.draft('RGB', size)  # Lets JPEG decode at reduced scale
+        image.thumbnail(size, Image.LANCZOS)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        # Write to a temporary name first so readers never see a half-written file
+        temporary = f"{target}.{os.getpid()}.tmp"
+        image.save(temporary, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=4)
+    os.replace(temporary, target)
+    return target
+
+
+# Function to get the grid image for an item: a cached thumbnail for local files, the original reference otherwise
+def thumbnail_for(image_url, size=THUMBNAIL_SIZE):
+    if not isinstance(image_url, str) or not os.path.isfile(image_url):
+        return image_url
+    try:
+        return generate_thumbnail(image_url, size)
+    except (OSError, ValueError):
+        # Unreadable or unsupported image: fall back to the original
+        return image_url
+
+
+def _generate_quietly(path, size):
+    try:
+        return path, generate_thumbnail(path, size)
+    except (OSError, ValueError) as e:
+        return path, e
+
+
+# Function to pre-generate thumbnails for many images in parallel
+def generate_all(paths, size=THUMBNAIL_SIZE, workers=None):
+    paths = sorted({path for path in paths if isinstance(path, str) and os.path.isfile(path)})
+    if not paths:
+        return {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_generate_quietly, paths, [size] * len(paths)))
+
+
+if __name__ == "__main__":
+    # Bulk mode: thumbnail the given files, or every image referenced by the catalog
+    import catalog_store
+
+    targets = sys.argv[1:]
+    if not targets:
+        targets = list(catalog_store.load_all_items()['image_url']) + list(catalog_store.load_listed_items()['image_url'])
+    for source, result in generate_all(targets).items():
+        print(f"{source} -> {result}")
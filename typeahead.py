@@ -0,0 +1,214 @@
+import bisect
+import heapq
+import json
+import re
+import threading
+import time
+
+import catalog_store
+
+# Detail fields whose values are offered as suggestions (manufacturer, artist, ...)
+SUGGEST_DETAIL_KEYS = {'Manufacturer', 'Brand', 'Artist', 'Designer', 'Developer'}
+
+# Suggestions returned per query
+TOP_K = 8
+
+# Prefixes up to this many characters keep a precomputed leader list; they match too many phrases to scan
+SHORT_PREFIX = 3
+
+# Phrases kept per precomputed leader list (more than TOP_K so longer prefixes can filter them)
+LEADERS = 50
+
+# Longest stretch of the sorted key array scanned for a longer prefix
+SCAN_LIMIT = 1000
+
+# Words inside a phrase that can start a match, so "dayt" finds "Rolex Daytona"
+MAX_WORD_STARTS = 4
+
+# Weight added each time a suggestion is picked or searched
+SEARCH_WEIGHT = 1
+
+# Seconds between checks of the store for items and listings written by other processes; listings written
+# in this process are added right away through catch_up()
+REFRESH_INTERVAL = 2.0
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+# Function to normalize text into a lookup key
+def normalize(text):
+    if not isinstance(text, str):
+        return ''
+    return ' '.join(text.lower().split())
+
+
+def _word_starts(phrase):
+    return [match.start() for match in WORD_PATTERN.finditer(phrase)][:MAX_WORD_STARTS]
+
+
+# Autocomplete over phrases ranked by popularity. Phrases are found by prefix through a sorted array of
+# "<suffix from a word start>\0<phrase>" keys; short prefixes answer from leader lists updated on every weight change.
+class Typeahead:
+    def __init__(self):
+        self.phrases = {}  # normalized phrase -> [display text, weight]
+        self.keys = []
+        self.leaders = {}  # short prefix -> phrases, heaviest first
+        self.last_listing_id = 0
+        self.last_item_id = 0
+        self.refreshed_at = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def weight(self, phrase):
+        entry = self.phrases.get(phrase)
+        return entry[1] if entry else 0
+
+    # Add weight to phrases (dict of display text -> weight), creating the ones not seen before
+    def add(self, weights):
+        with self.lock:
+            new_keys = []
+            touched = []
+            for text, weight in weights.items():
+                phrase = normalize(text)
+                if not phrase:
+                    continue
+                entry = self.phrases.get(phrase)
+                if entry is None:
+                    entry = self.phrases[phrase] = [' '.join(text.split()), 0]
+                    new_keys.extend(f"{phrase[start:]}\0{phrase}" for start in _word_starts(phrase))
+                entry[1] += weight
+                touched.append(phrase)
+            if new_keys:
+                if len(new_keys) > 100:
+                    # Bulk loads merge one sorted run instead of inserting key by key
+                    self.keys.extend(new_keys)
+                    self.keys.sort()
+                else:
+                    for key in new_keys:
+                        bisect.insort(self.keys, key)
+            if len(touched) > 100:
+                self._rebuild_leaders(touched)
+            else:
+                for phrase in touched:
+                    self._promote(phrase)
+
+    def _short_prefixes(self, phrase):
+        return {phrase[start:start + depth] for start in _word_starts(phrase) for depth in range(1, SHORT_PREFIX + 1)}
+
+    def _rebuild_leaders(self, phrases):
+        # Bulk loads pick each affected prefix's leaders in one pass instead of phrase by phrase
+        candidates = {}
+        for phrase in phrases:
+            for prefix in self._short_prefixes(phrase):
+                candidates.setdefault(prefix, set()).add(phrase)
+        for prefix, members in candidates.items():
+            members.update(self.leaders.get(prefix, ()))
+            self.leaders[prefix] = heapq.nlargest(LEADERS, members, key=lambda phrase: self.phrases[phrase][1])
+
+    def _promote(self, phrase):
+        weight = self.phrases[phrase][1]
+        for prefix in self._short_prefixes(phrase):
+            leaders = self.leaders.setdefault(prefix, [])
+            if phrase in leaders:
+                leaders.remove(phrase)
+            elif len(leaders) >= LEADERS and self.phrases[leaders[-1]][1] >= weight:
+                continue
+            position = len(leaders)
+            while position and self.phrases[leaders[position - 1]][1] < weight:
+                position -= 1
+            leaders.insert(position, phrase)
+            del leaders[LEADERS:]
+
+    def _matches(self, phrase, prefix):
+        return any(phrase.startswith(prefix, start) for start in _word_starts(phrase))
+
+    # Return up to `limit` suggestions (display text) for a typed prefix, most popular first
+    def suggest(self, prefix, limit=TOP_K):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            if len(prefix) <= SHORT_PREFIX:
+                ranked = self.leaders.get(prefix, [])[:limit]
+            else:
+                low = bisect.bisect_left(self.keys, prefix)
+                high = bisect.bisect_left(self.keys, prefix + '\uffff', low)
+                candidates = {key.partition('\0')[2] for key in self.keys[low:min(high, low + SCAN_LIMIT)]}
+                if high - low > SCAN_LIMIT:
+                    # Too many matches to scan: the leaders of the first characters that also match the full prefix
+                    candidates.update(
+                        phrase for phrase in self.leaders.get(prefix[:SHORT_PREFIX], []) if self._matches(phrase, prefix)
+                    )
+                ranked = heapq.nlargest(limit, candidates, key=lambda phrase: (self.phrases[phrase][1], -len(phrase)))
+            return [self.phrases[phrase][0] for phrase in ranked]
+
+    # Add item names, and the names, categories and detail values of listings, stored since the last refresh
+    def refresh(self):
+        self.refreshed_at = time.monotonic()
+        weights = {}
+
+        def bump(text):
+            if isinstance(text, str) and text.strip():
+                weights[text] = weights.get(text, 0) + 1
+
+        with catalog_store.reader() as conn:
+            items = conn.execute(
+                "SELECT item_id, name FROM items WHERE item_id > ? ORDER BY item_id", (self.last_item_id,)
+            ).fetchall()
+            listings = conn.execute(
+                "SELECT listing_id, name, category, details_json FROM listings WHERE listing_id > ? ORDER BY listing_id",
+                (self.last_listing_id,)
+            ).fetchall()
+        for row in items:
+            bump(row['name'])
+        for row in listings:
+            # Every listing counts towards the popularity of its name, category and notable details
+            bump(row['name'])
+            bump(row['category'])
+            for key, value in json.loads(row['details_json'] or '[]'):
+                if key in SUGGEST_DETAIL_KEYS:
+                    bump(value)
+        if weights:
+            self.add(weights)
+        with self.lock:
+            if items:
+                self.last_item_id = max(self.last_item_id, items[-1]['item_id'])
+            if listings:
+                self.last_listing_id = max(self.last_listing_id, listings[-1]['listing_id'])
+        return len(items) + len(listings)
+
+
+_typeahead = None
+_typeahead_lock = threading.Lock()
+
+
+# Function to get the process-wide typeahead, built once and caught up incrementally at most every REFRESH_INTERVAL
+def get_typeahead():
+    global _typeahead
+    with _typeahead_lock:
+        if _typeahead is None:
+            _typeahead = Typeahead()
+        if _typeahead.refreshed_at is None or time.monotonic() - _typeahead.refreshed_at >= REFRESH_INTERVAL:
+            _typeahead.refresh()
+    return _typeahead
+
+
+# Function to add freshly written listings without waiting for the next refresh, if this process built the typeahead
+def catch_up():
+    with _typeahead_lock:
+        if _typeahead is not None:
+            _typeahead.refresh()
+
+
+# Function to get suggestions for a typed prefix
+def suggest(prefix, limit=TOP_K):
+    return get_typeahead().suggest(prefix, limit=limit)
+
+
+# Function to count a search towards the popularity of its phrase (only phrases from the catalog are suggested)
+def record_search(query):
+    index = get_typeahead()
+    if normalize(query) in index.phrases:
+        index.add({query: SEARCH_WEIGHT})
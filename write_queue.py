@@ -0,0 +1,191 @@
+import atexit
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import bulk_list
+import catalog_store
+
+# Batching window in seconds: commands arriving within one window are applied in a single transaction
+# (override with WRITE_FLUSH_INTERVAL; 0 applies every command on the caller's thread)
+FLUSH_INTERVAL = float(os.environ.get("WRITE_FLUSH_INTERVAL", 0.05))
+
+# Upper bound on commands per batch
+MAX_BATCH = 500
+
+# Finished tickets kept for status polling
+MAX_TICKETS = 10_000
+
+
+# A queued write command; the UI keeps its id and polls the status
+class Ticket:
+    def __init__(self, kind, payload):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.done = threading.Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.status = 'failed' if error is not None else 'done'
+        self.done.set()
+
+    # Block until the command is applied; returns its result or raises its error
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"{self.kind} write was not applied in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+# Apply a batch of listings in one transaction; one result per payload
+def _apply_listings(payloads):
+    return [
+        (result, None if result['status'] == 'listed' else ValueError(result['message']))
+        for result in bulk_list.bulk_list(payloads)
+    ]
+
+
+# Apply a batch of bulk listings in one transaction; each payload is a list of entries and gets its per-item report
+def _apply_bulk_listings(payloads):
+    results = bulk_list.bulk_list([entry for entries in payloads for entry in entries])
+    outcomes = []
+    for entries in payloads:
+        outcomes.append((results[:len(entries)], None))
+        results = results[len(entries):]
+    return outcomes
+
+
+# Apply a batch of buyer messages in one transaction; one message id per payload
+def _apply_messages(payloads):
+    return [(message_id, None) for message_id in catalog_store.add_messages(payloads)]
+
+
+HANDLERS = {
+    'list_item': _apply_listings,
+    'bulk_list': _apply_bulk_listings,
+    'message': _apply_messages,
+}
+
+
+# Background writer: a worker thread drains queued commands and applies each kind in batches
+class WriteQueue:
+    def __init__(self, flush_interval=FLUSH_INTERVAL, handlers=None):
+        self.flush_interval = flush_interval
+        self.handlers = dict(handlers or HANDLERS)
+        self.pending = []
+        self.tickets = OrderedDict()
+        self.condition = threading.Condition()
+        self.apply_lock = threading.Lock()
+        self.worker = None
+        self.closed = False
+
+    # Queue a command and return its ticket immediately
+    def submit(self, kind, payload):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown write command: {kind}")
+        ticket = Ticket(kind, payload)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Write queue is closed")
+            self.tickets[ticket.id] = ticket
+            while len(self.tickets) > MAX_TICKETS:
+                self.tickets.popitem(last=False)
+            if self.flush_interval > 0:
+                self.pending.append(ticket)
+                self._ensure_worker()
+                self.condition.notify()
+        if self.flush_interval <= 0:
+            self._apply([ticket])
+        return ticket
+
+    # Function to look up a ticket by id (None once it has aged out)
+    def get(self, ticket_id):
+        with self.condition:
+            return self.tickets.get(ticket_id)
+
+    # Apply everything currently queued
+    def flush(self):
+        with self.condition:
+            batch, self.pending = self.pending, []
+        for start in range(0, len(batch), MAX_BATCH):
+            self._apply(batch[start:start + MAX_BATCH])
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.flush()
+
+    def _ensure_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self.worker.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.pending and not self.closed:
+                    self.condition.wait()
+                if self.closed and not self.pending:
+                    return
+            # Let the window fill up so concurrent commands share one transaction
+            deadline = time.monotonic() + self.flush_interval
+            with self.condition:
+                while len(self.pending) < MAX_BATCH and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            self.flush()
+
+    def _apply(self, batch):
+        by_kind = OrderedDict()
+        for ticket in batch:
+            by_kind.setdefault(ticket.kind, []).append(ticket)
+        with self.apply_lock:
+            for kind, tickets in by_kind.items():
+                try:
+                    outcomes = self.handlers[kind]([ticket.payload for ticket in tickets])
+                except Exception as e:
+                    # The handler's transaction rolled back, so nothing in this batch was written
+                    for ticket in tickets:
+                        ticket.finish(error=e)
+                    continue
+                for ticket, (result, error) in zip(tickets, outcomes):
+                    ticket.finish(result=result, error=error)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+# Function to get the process-wide write queue
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteQueue()
+            atexit.register(_queue.close)
+    return _queue
+
+
+# Function to queue a write command ("list_item", "bulk_list" or "message"); returns its ticket
+def submit(kind, payload):
+    return get_queue().submit(kind, payload)
+
+
+# Function to poll a ticket: returns (status, result, error message); status is "unknown" once it aged out
+def status(ticket_id):
+    ticket = get_queue().get(ticket_id)
+    if ticket is None:
+        return 'unknown', None, None
+    return ticket.status, ticket.result, str(ticket.error) if ticket.error is not None else None
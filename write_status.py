@@ -0,0 +1,40 @@
+import streamlit as st
+
+import write_queue
+
+# Seconds between checks of a queued write while it is pending
+POLL_INTERVAL = 0.5
+
+
+# Function to remember a queued write so the page can report its outcome
+def track(key, ticket):
+    st.session_state[key] = ticket.id
+
+
+# Function to show the outcome of the write tracked under `key`, polling while it is still queued.
+# `done_text` may be a function of the write's result, and `show_result(result)` renders it below the message.
+def show_status(key, queued_text, done_text, failed_text="Write failed", show_result=None):
+    ticket_id = st.session_state.get(key)
+    if ticket_id is None:
+        return None
+    status, result, error = write_queue.status(ticket_id)
+    if status == 'queued':
+        _poll(key, queued_text)
+        return status
+    del st.session_state[key]
+    if status == 'done':
+        st.success(done_text(result) if callable(done_text) else done_text)
+        if show_result is not None:
+            show_result(result)
+    elif status == 'failed':
+        st.error(f"{failed_text}: {error}")
+    return status
+
+
+# Only this fragment reruns while the write is pending; once it finishes the whole page reruns to show the outcome
+@st.fragment(run_every=POLL_INTERVAL)
+def _poll(key, queued_text):
+    ticket_id = st.session_state.get(key)
+    if ticket_id is None or write_queue.status(ticket_id)[0] != 'queued':
+        st.rerun()
+    st.info(queued_text)